@@ -1,7 +1,7 @@
 """
 Configuration settings for the PDF Hint Chatbot application.
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 import os
 
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    LOG_LEVEL: str = "INFO"
 
     # Paths
     BASE_DIR: Path = Path(__file__).parent.parent
@@ -28,6 +29,27 @@ class Settings(BaseSettings):
     # Chat Configuration
     MAX_HISTORY_LENGTH: int = 20
     SESSION_TIMEOUT_MINUTES: int = 60
+    MAX_SESSIONS: int = 10_000
+
+    # Ingestion Configuration
+    PDF_LOAD_WORKERS: int = 1  # Processes for PDF extraction at startup (0 = CPU count)
+    CHROMA_ADD_BATCH_SIZE: int = 200  # Chunks per ChromaDB add() call
+
+    # Retrieval Configuration
+    RETRIEVAL_CACHE_SIZE: int = 1024
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 300
+    RETRIEVAL_N_RESULTS: int = 5
+    RETRIEVAL_MAX_BATCH_SIZE: int = 16
+    RETRIEVAL_MAX_WAIT_MS: int = 10
+    QUERY_CACHE_SIZE: int = 512  # Vector searches reused for near-duplicate queries (0 = off)
+    QUERY_CACHE_THRESHOLD: float = 0.97  # Query embedding cosine similarity for a cache hit
+    EMBEDDING_INT8: bool = True
+    EMBEDDING_DEVICE: str = "cpu"  # "cuda" embeds on a GPU (needs onnxruntime-gpu)
+    HNSW_M: int = 24  # Graph links per vector; set when the collection is created
+    HNSW_CONSTRUCTION_EF: int = 128  # Build-time candidates; set when the collection is created
+    HNSW_SEARCH_EF: int = 64  # Query-time candidates (>= retrieval candidates)
+    RERANK_ENABLED: bool = True  # Cross-encoder rescoring; adds latency to every query
+    RERANKER_MODEL: str = "BAAI/bge-reranker-base"
 
     # LLM Configuration
     MODEL_NAME: str = "gemini-2.0-flash-exp"
@@ -35,10 +57,11 @@ class Settings(BaseSettings):
     MAX_OUTPUT_TOKENS: int = 1024
     TOP_P: float = 0.9
     TOP_K: int = 40
+    GEMINI_QPM: int = 20  # Requests per minute allowed to Gemini
+    GEMINI_BURST: int = 5  # Requests that may be sent back-to-back
+    GEMINI_MAX_CONCURRENCY: int = 4  # Gemini calls allowed in flight at once
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
 # Create global settings instance
@@ -1,12 +1,15 @@
 """
 Main FastAPI application for the PDF Hint Chatbot.
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import asyncio
+import json
+import logging
 import shutil
-from datetime import datetime
 from typing import List
 import os
 
@@ -17,13 +20,20 @@ from .models import (
     Message,
     HealthResponse,
     ClearResponse,
-    ErrorResponse,
     SessionInfo,
     UploadResponse,
 )
 from .services.knowledge_base import KnowledgeBase
 from .services.llm_service import LLMService
 from .services.chat_manager import ChatManager
+from .services.retrieval_cache import RetrievalCache
+from .services.retrieval_batcher import RetrievalBatcher
+from .services.reranker import Reranker
+from .utils.clock import iso_now
+from .utils.log import setup_logging
+
+
+logger = logging.getLogger("app")
 
 
 # Initialize FastAPI app
@@ -31,6 +41,7 @@ app = FastAPI(
     title="PDF Hint Chatbot",
     description="Educational chatbot that provides hints based on class materials",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -42,43 +53,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON and static responses (SSE streams are left uncompressed)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Global service instances (initialized on startup)
 knowledge_base: KnowledgeBase = None
 chat_manager: ChatManager = None
 llm_service: LLMService = None
+retrieval_cache: RetrievalCache = None
+retrieval_batcher: RetrievalBatcher = None
+ingest_task: asyncio.Task = None
+log_listener = None
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on application startup."""
-    global knowledge_base, chat_manager, llm_service
-
-    print("\n" + "=" * 70)
-    print("PDF HINT CHATBOT - STARTING UP")
-    print("=" * 70)
+def load_knowledge_base():
+    """Load the reranker and all PDFs into the knowledge base (runs in a worker thread)."""
+    # Load the cross-encoder before chat opens, so the first queries don't
+    # wait for it (and for its download after a fresh deploy)
+    if knowledge_base.reranker is not None:
+        knowledge_base.reranker.load()
 
-    # Initialize knowledge base
-    print("\n[1/3] Initializing Knowledge Base...")
-    knowledge_base = KnowledgeBase(str(settings.DATA_DIR))
     knowledge_base.load_pdfs()
 
     # Check if any PDFs were loaded
     if not knowledge_base.has_content():
-        print("\n⚠️  WARNING: No PDFs were loaded!")
-        print("   Please add PDF files to:")
-        print(f"   - {settings.PDF_MATERIALS_DIR}")
-        print(f"   - {settings.PDF_ASSIGNMENTS_DIR}")
-        print("   The chatbot will have no knowledge to work with.")
+        logger.warning("⚠️  No PDFs were loaded!")
+        logger.warning("   Please add PDF files to:")
+        logger.warning("   - %s", settings.PDF_MATERIALS_DIR)
+        logger.warning("   - %s", settings.PDF_ASSIGNMENTS_DIR)
+        logger.warning("   The chatbot will have no knowledge to work with.")
+
+
+def log_ingest_result(task: asyncio.Task) -> None:
+    """Log an error that stopped the background PDF load (task done-callback)."""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error("✗ ERROR loading PDFs: %s", error, exc_info=error)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize services on application startup."""
+    global knowledge_base, chat_manager, llm_service, retrieval_cache, retrieval_batcher, ingest_task
+    global log_listener
+
+    log_listener = setup_logging(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+
+    logger.info("=" * 70)
+    logger.info("PDF HINT CHATBOT - STARTING UP")
+    logger.info("=" * 70)
+
+    # Initialize knowledge base (PDFs are loaded in the background so the
+    # server can start accepting connections immediately)
+    logger.info("[1/3] Initializing Knowledge Base...")
+    reranker = Reranker(settings.RERANKER_MODEL) if settings.RERANK_ENABLED else None
+    knowledge_base = KnowledgeBase(
+        str(settings.DATA_DIR),
+        reranker=reranker,
+        quantize_embeddings=settings.EMBEDDING_INT8,
+        load_workers=settings.PDF_LOAD_WORKERS,
+        vector_add_batch_size=settings.CHROMA_ADD_BATCH_SIZE,
+        embedding_device=settings.EMBEDDING_DEVICE,
+        hnsw_m=settings.HNSW_M,
+        hnsw_construction_ef=settings.HNSW_CONSTRUCTION_EF,
+        hnsw_search_ef=settings.HNSW_SEARCH_EF,
+        query_cache_size=settings.QUERY_CACHE_SIZE,
+        query_cache_threshold=settings.QUERY_CACHE_THRESHOLD,
+    )
+    ingest_task = asyncio.create_task(asyncio.to_thread(load_knowledge_base))
+    ingest_task.add_done_callback(log_ingest_result)
+    retrieval_cache = RetrievalCache(
+        max_size=settings.RETRIEVAL_CACHE_SIZE,
+        ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+    )
+    retrieval_batcher = RetrievalBatcher(
+        knowledge_base,
+        n_results=settings.RETRIEVAL_N_RESULTS,
+        max_batch_size=settings.RETRIEVAL_MAX_BATCH_SIZE,
+        max_wait_ms=settings.RETRIEVAL_MAX_WAIT_MS,
+    )
+    retrieval_batcher.start()
 
     # Initialize chat manager
-    print(f"\n[2/3] Initializing Chat Manager...")
+    logger.info("[2/3] Initializing Chat Manager...")
     chat_manager = ChatManager(
         max_history_length=settings.MAX_HISTORY_LENGTH,
         session_timeout_minutes=settings.SESSION_TIMEOUT_MINUTES,
+        max_sessions=settings.MAX_SESSIONS,
     )
 
     # Initialize LLM service (RAG approach - no initial context needed)
-    print(f"\n[3/3] Initializing LLM Service...")
+    logger.info("[3/3] Initializing LLM Service...")
     try:
         llm_service = LLMService(
             api_key=settings.GEMINI_API_KEY,
@@ -87,19 +154,98 @@ async def startup_event():
             max_output_tokens=settings.MAX_OUTPUT_TOKENS,
             top_p=settings.TOP_P,
             top_k=settings.TOP_K,
+            requests_per_minute=settings.GEMINI_QPM,
+            burst=settings.GEMINI_BURST,
+            max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
         )
-        print("✓ LLM Service configured successfully")
-        print("✓ Using RAG (Retrieval-Augmented Generation) with ChromaDB")
+        logger.info("✓ LLM Service configured successfully")
+        logger.info("✓ Using RAG (Retrieval-Augmented Generation) with ChromaDB")
     except Exception as e:
-        print(f"✗ ERROR initializing LLM Service: {str(e)}")
-        print("   Please check your GEMINI_API_KEY in the .env file")
+        logger.error("✗ ERROR initializing LLM Service: %s", e)
+        logger.error("   Please check your GEMINI_API_KEY in the .env file")
+
+    logger.info("=" * 70)
+    logger.info("✓ APPLICATION READY")
+    logger.info("=" * 70)
+    logger.info("Server running at: http://%s:%s", settings.HOST, settings.PORT)
+    logger.info("Open your browser to start chatting!")
+    logger.info("=" * 70)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background services on application shutdown."""
+    if retrieval_batcher is not None:
+        await retrieval_batcher.stop()
+    if llm_service is not None:
+        await llm_service.close()
+    if knowledge_base is not None and knowledge_base.vector_store is not None:
+        knowledge_base.vector_store.close()
+    if log_listener is not None:
+        log_listener.stop()
+
+
+def check_chat_ready():
+    """
+    Ensure the services needed to answer chat messages are available.
+
+    Raises:
+        HTTPException: If the LLM service or knowledge base is not ready
+    """
+    # Check if LLM service is initialized
+    if llm_service is None:
+        raise HTTPException(
+            status_code=500,
+            detail="LLM service not initialized. Please check API key configuration.",
+        )
+
+    # PDFs are still being loaded in the background
+    if not knowledge_base.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge base is still loading. Please try again shortly.",
+        )
 
-    print("\n" + "=" * 70)
-    print("✓ APPLICATION READY")
-    print("=" * 70)
-    print(f"Server running at: http://{settings.HOST}:{settings.PORT}")
-    print("Open your browser to start chatting!")
-    print("=" * 70 + "\n")
+
+def resolve_session(session_id: str) -> str:
+    """
+    Reuse an active session or create a new one.
+
+    Args:
+        session_id: Session identifier from the request (may be empty)
+
+    Returns:
+        Session ID to use for this conversation
+    """
+    if not session_id or not chat_manager.session_exists(session_id):
+        return chat_manager.create_session()
+
+    # Create new session for expired one
+    if chat_manager.is_session_expired(session_id):
+        return chat_manager.create_session()
+
+    return session_id
+
+
+async def retrieve_context(message: str) -> str:
+    """
+    Retrieve relevant context for a message using semantic search (RAG).
+
+    Cache misses go through the batcher, which runs concurrent searches as
+    a single vector store query in a worker thread.
+
+    Args:
+        message: Student's question
+
+    Returns:
+        Formatted string with relevant context from PDFs
+    """
+    n_results = settings.RETRIEVAL_N_RESULTS
+    relevant_context = retrieval_cache.get(message, n_results)
+    if relevant_context is None:
+        relevant_context = await retrieval_batcher.get_relevant_context(message)
+        retrieval_cache.set(message, n_results, relevant_context)
+    return relevant_context
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -113,23 +259,8 @@ async def chat(request: ChatRequest):
     Returns:
         ChatResponse with session_id, response, and timestamp
     """
-    # Check if LLM service is initialized
-    if llm_service is None:
-        raise HTTPException(
-            status_code=500,
-            detail="LLM service not initialized. Please check API key configuration.",
-        )
-
-    # Create or validate session
-    if not request.session_id or not chat_manager.session_exists(request.session_id):
-        session_id = chat_manager.create_session()
-    else:
-        # Check if session is expired
-        if chat_manager.is_session_expired(request.session_id):
-            # Create new session for expired one
-            session_id = chat_manager.create_session()
-        else:
-            session_id = request.session_id
+    check_chat_ready()
+    session_id = resolve_session(request.session_id)
 
     try:
         # Add user message to history
@@ -139,14 +270,10 @@ async def chat(request: ChatRequest):
         history = chat_manager.get_history(session_id)
         context_history = history[:-1] if len(history) > 1 else []
 
-        # Retrieve relevant context using semantic search (RAG)
-        relevant_context = knowledge_base.get_relevant_context(
-            query=request.message,
-            n_results=5  # Get top 5 most relevant chunks
-        )
+        relevant_context = await retrieve_context(request.message)
 
         # Generate hint-based response with retrieved context
-        response = llm_service.generate_hint(
+        response = await llm_service.generate_hint_async(
             question=request.message,
             relevant_context=relevant_context,
             conversation_history=context_history
@@ -155,18 +282,80 @@ async def chat(request: ChatRequest):
         # Add assistant response to history
         chat_manager.add_message(session_id, "assistant", response)
 
-        return ChatResponse(
-            session_id=session_id,
-            response=response,
-            timestamp=datetime.now().isoformat(),
-        )
+        # Return the response directly; ChatResponse stays as response_model
+        # for the OpenAPI schema but isn't constructed or re-validated
+        return ORJSONResponse({
+            "session_id": session_id,
+            "response": response,
+            "timestamp": iso_now(),
+        })
 
     except Exception as e:
         # Log error
-        print(f"Error in chat endpoint: {str(e)}")
+        logger.error("Error in chat endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint - receive the hint as Server-Sent Events.
+
+    Each event is a JSON object. Text arrives as {"session_id", "delta"}
+    events, followed by a final {"session_id", "done": true, "timestamp"}
+    event once the full response has been saved to history. If generation
+    fails part-way, an {"session_id", "error"} event ends the stream instead
+    and nothing is saved.
+
+    Args:
+        request: ChatRequest with optional session_id and message
+
+    Returns:
+        StreamingResponse with text/event-stream content
+    """
+    check_chat_ready()
+    session_id = resolve_session(request.session_id)
+
+    # The user message is only added to history together with the complete
+    # response, so a failed stream or a client that disconnects mid-stream
+    # doesn't leave an unanswered user turn behind
+    context_history = chat_manager.get_history(session_id)
+
+    relevant_context = await retrieve_context(request.message)
+
+    async def event_stream():
+        parts = []
+        try:
+            async for text in llm_service.generate_hint_stream(
+                question=request.message,
+                relevant_context=relevant_context,
+                conversation_history=context_history,
+            ):
+                parts.append(text)
+                yield f"data: {json.dumps({'session_id': session_id, 'delta': text})}\n\n"
+        except Exception as e:
+            # Gemini failed after part of the reply was sent; drop the partial reply
+            logger.error("Error in chat stream: %s", e)
+            error = "The response was interrupted. Please try again."
+            yield f"data: {json.dumps({'session_id': session_id, 'error': error})}\n\n"
+            return
+
+        # Persist the exchange once streaming has finished. The session may
+        # have expired or been evicted while Gemini was streaming.
+        try:
+            chat_manager.add_message(session_id, "user", request.message)
+            chat_manager.add_message(session_id, "assistant", "".join(parts))
+        except ValueError as e:
+            logger.error("Error saving chat stream: %s", e)
+            error = "Your session ended before the response could be saved. Please start a new chat."
+            yield f"data: {json.dumps({'session_id': session_id, 'error': error})}\n\n"
+            return
+
+        yield f"data: {json.dumps({'session_id': session_id, 'done': True, 'timestamp': iso_now()})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/api/history/{session_id}", response_model=List[Message])
 async def get_history(session_id: str):
     """
@@ -231,6 +420,7 @@ async def cleanup_sessions():
         Number of sessions cleaned up
     """
     count = chat_manager.cleanup_expired_sessions()
+    retrieval_cache.clear()
     return {"cleaned_up": count, "message": f"Cleaned up {count} expired session(s)"}
 
 
@@ -243,8 +433,14 @@ async def health_check():
         Service health status and loaded PDF count
     """
     summary = knowledge_base.get_summary()
+    if not knowledge_base.ready:
+        status = "loading"
+    elif knowledge_base.load_failed:
+        status = "degraded"  # Loading stopped on an error; see load_errors
+    else:
+        status = "healthy"
     return HealthResponse(
-        status="healthy",
+        status=status,
         materials_loaded=summary["materials_count"],
         assignments_loaded=summary["assignments_count"],
         total_pdfs=summary["total_pdfs"],
@@ -266,38 +462,58 @@ async def get_stats():
     return {
         "knowledge_base": kb_summary,
         "chat_sessions": chat_stats,
+        "retrieval_cache": retrieval_cache.get_stats(),
+        "vector_store": (
+            knowledge_base.vector_store.get_stats() if knowledge_base.vector_store else None
+        ),
+        "llm": llm_service.get_stats() if llm_service else None,
     }
 
 
-@app.get("/api/assignment-questions")
-async def get_assignment_questions():
+def etag_matches(if_none_match: str, etag: str) -> bool:
     """
-    Get all structured assignment questions for sidebar display.
+    Check an If-None-Match header against an ETag using weak comparison.
+
+    Args:
+        if_none_match: Header value: "*" or a comma-separated list of ETags
+        etag: Current ETag of the resource
 
     Returns:
-        List of assignment questions with metadata
+        True if the client's cached copy is still current
     """
-    questions_by_file = []
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison ignores the W/ prefix on either side
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag
+        for tag in if_none_match.split(",")
+    )
 
-    for filename, structured_content in knowledge_base.assignment_structures.items():
-        questions = structured_content.get('questions', [])
 
-        if questions:
-            questions_by_file.append({
-                "filename": filename,
-                "questions": [
-                    {
-                        "id": q['id'],
-                        "text": q['text'],
-                        "has_scenario": q.get('has_scenario', False),
-                        "has_table": q.get('has_table', False),
-                        "has_image": q.get('has_image', False),
-                    }
-                    for q in questions
-                ]
-            })
+@app.get("/api/assignment-questions")
+async def get_assignment_questions(request: Request):
+    """
+    Get all structured assignment questions for sidebar display.
 
-    return {"assignments": questions_by_file}
+    The payload is precomputed by the knowledge base whenever assignments
+    are loaded. It carries an ETag so browsers can revalidate cheaply and
+    get a 304 until the loaded assignments change.
+
+    Returns:
+        List of assignment questions with metadata
+    """
+    body, etag = knowledge_base.assignment_index
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 @app.post("/api/upload/material", response_model=UploadResponse)
@@ -317,6 +533,13 @@ async def upload_material(file: UploadFile = File(...)):
             detail="Only PDF files are allowed"
         )
 
+    # Uploads wait for the startup load, which writes the same files and indexes
+    if not knowledge_base.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge base is still loading. Please try again shortly.",
+        )
+
     # Save file to materials directory
     materials_dir = settings.PDF_MATERIALS_DIR
     materials_dir.mkdir(parents=True, exist_ok=True)
@@ -326,8 +549,12 @@ async def upload_material(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
 
-        # Add to knowledge base
-        result = knowledge_base.add_single_pdf(str(file_path), "material")
+        # Add to knowledge base (extraction, embedding and the vector store
+        # write are blocking, so run them off the event loop)
+        result = await asyncio.to_thread(
+            knowledge_base.add_single_pdf, str(file_path), "material"
+        )
+        retrieval_cache.clear()  # Cached context may now be incomplete
 
         if result["success"]:
             return UploadResponse(
@@ -366,6 +593,13 @@ async def upload_assignment(file: UploadFile = File(...)):
             detail="Only PDF files are allowed"
         )
 
+    # Uploads wait for the startup load, which writes the same files and indexes
+    if not knowledge_base.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge base is still loading. Please try again shortly.",
+        )
+
     # Save file to assignments directory
     assignments_dir = settings.PDF_ASSIGNMENTS_DIR
     assignments_dir.mkdir(parents=True, exist_ok=True)
@@ -375,8 +609,12 @@ async def upload_assignment(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
 
-        # Add to knowledge base
-        result = knowledge_base.add_single_pdf(str(file_path), "assignment")
+        # Add to knowledge base (extraction, embedding and the vector store
+        # write are blocking, so run them off the event loop)
+        result = await asyncio.to_thread(
+            knowledge_base.add_single_pdf, str(file_path), "assignment"
+        )
+        retrieval_cache.clear()  # Cached context may now be incomplete
 
         if result["success"]:
             return UploadResponse(
@@ -431,12 +669,10 @@ async def serve_chatbot():
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """Handle 404 errors."""
-    from fastapi.responses import JSONResponse
-    return JSONResponse(status_code=404, content={"detail": "Resource not found"})
+    return ORJSONResponse(status_code=404, content={"detail": "Resource not found"})
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     """Handle 500 errors."""
-    from fastapi.responses import JSONResponse
-    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
@@ -1,7 +1,7 @@
 """
 Pydantic models for API request and response validation.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 
 
@@ -19,13 +19,14 @@ class ChatRequest(BaseModel):
         description="The student's question or message",
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "123e4567-e89b-12d3-a456-426614174000",
                 "message": "Can you help me understand question 3 from the assignment?",
             }
         }
+    )
 
 
 class ChatResponse(BaseModel):
@@ -35,14 +36,15 @@ class ChatResponse(BaseModel):
     response: str = Field(..., description="Hint-based response from the assistant")
     timestamp: str = Field(..., description="ISO 8601 timestamp of the response")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "123e4567-e89b-12d3-a456-426614174000",
                 "response": "Question 3 relates to the concept discussed in the lecture about algorithms. Try reviewing that section and think about how recursion applies here. What's the base case?",
                 "timestamp": "2024-01-15T10:30:00.000000",
             }
         }
+    )
 
 
 class Message(BaseModel):
@@ -52,14 +54,15 @@ class Message(BaseModel):
     content: str = Field(..., description="Content of the message")
     timestamp: str = Field(..., description="ISO 8601 timestamp of the message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "role": "user",
                 "content": "How do I solve problem 5?",
                 "timestamp": "2024-01-15T10:30:00.000000",
             }
         }
+    )
 
 
 class SessionInfo(BaseModel):
@@ -71,8 +74,8 @@ class SessionInfo(BaseModel):
     last_activity: str = Field(..., description="ISO 8601 timestamp of last activity")
     is_expired: bool = Field(..., description="Whether the session has expired")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "123e4567-e89b-12d3-a456-426614174000",
                 "message_count": 8,
@@ -81,6 +84,7 @@ class SessionInfo(BaseModel):
                 "is_expired": False,
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
@@ -94,8 +98,8 @@ class HealthResponse(BaseModel):
         ..., description="Whether any PDFs have been successfully loaded"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "materials_loaded": 5,
@@ -104,15 +108,7 @@ class HealthResponse(BaseModel):
                 "has_content": True,
             }
         }
-
-
-class ErrorResponse(BaseModel):
-    """Response model for error messages."""
-
-    detail: str = Field(..., description="Error message")
-
-    class Config:
-        json_schema_extra = {"example": {"detail": "Session not found"}}
+    )
 
 
 class ClearResponse(BaseModel):
@@ -121,13 +117,14 @@ class ClearResponse(BaseModel):
     message: str = Field(..., description="Success message")
     session_id: str = Field(..., description="Session ID that was cleared")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "message": "History cleared successfully",
                 "session_id": "123e4567-e89b-12d3-a456-426614174000",
             }
         }
+    )
 
 
 class UploadResponse(BaseModel):
@@ -138,8 +135,8 @@ class UploadResponse(BaseModel):
     file_type: Optional[str] = Field(None, description="Type of file (material or assignment)")
     message: str = Field(..., description="Status message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "filename": "chapter1_notes.pdf",
@@ -147,3 +144,4 @@ class UploadResponse(BaseModel):
                 "message": "Successfully added chapter1_notes.pdf to Class Materials",
             }
         }
+    )
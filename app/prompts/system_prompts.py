@@ -48,6 +48,11 @@ Remember: You're a supportive tutor helping students learn and grow. Guide them
 """
 
 
+# The system prompt is built on every request, so split the template around
+# the context slot once at import instead of re-parsing it with str.format.
+_SYSTEM_PROMPT_PREFIX, _SYSTEM_PROMPT_SUFFIX = HINT_SYSTEM_PROMPT.split("{context}")
+
+
 CONVERSATION_PROMPT_TEMPLATE = """Previous conversation:
 {history}
 
@@ -66,7 +71,7 @@ def build_system_prompt(knowledge_context: str) -> str:
     Returns:
         Formatted system prompt with context injected
     """
-    return HINT_SYSTEM_PROMPT.format(context=knowledge_context)
+    return _SYSTEM_PROMPT_PREFIX + knowledge_context + _SYSTEM_PROMPT_SUFFIX
 
 
 def build_user_prompt(question: str, history: str = "") -> str:
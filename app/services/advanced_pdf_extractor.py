@@ -3,6 +3,8 @@ Advanced PDF content extractor using PyMuPDF capabilities.
 Handles text, tables, images, and structured content extraction.
 """
 import fitz  # PyMuPDF
+import multiprocessing
+import os
 import re
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
@@ -10,31 +12,109 @@ import base64
 from io import BytesIO
 
 
+def _keyword_regex(keywords: Tuple[str, ...]) -> re.Pattern:
+    """Compile a pattern matching any of the keywords as a plain substring."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+# Patterns and word lists are built once at import and shared by every
+# extractor instance, so creating an extractor doesn't recompile them.
+
+# Match ALL possible question/item patterns (numbers, letters, keywords)
+# We'll use content analysis to determine if it's actually a question
+_QUESTION_PATTERNS = (
+    r'^(\d+[\.\)]\s+)',      # 1. or 1) - could be questions or scenarios
+    r'^([a-z][\.\)]\s+)',    # a. or a) - sub-questions
+    r'^([A-Z][\.\)]\s+)',    # A. or A) - sub-questions
+    r'^(Question\s+\d+)',    # Question 1
+    r'^(Problem\s+\d+)',     # Problem 1
+    r'^(Exercise\s+\d+)',    # Exercise 1
+    r'^([ivxIVX]+[\.\)]\s+)', # i., ii., iii. - Roman numerals
+)
+# All markers as one alternation, matched case-insensitively. Alternatives
+# are tried in list order, and each keeps its own marker group, so
+# match.lastindex tells which matched.
+_QUESTION_START_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in _QUESTION_PATTERNS), re.IGNORECASE
+)
+_NUMBER_PREFIX_RE = re.compile(r'^[0-9a-zA-Z]+[\.\)]\s*', re.IGNORECASE)
+_NUMBERED_ITEM_RE = re.compile(r'^\d+[\.\)]\s+')
+_ROMAN_CHARS = frozenset('ivxIVX')
+
+# Question indicator words that suggest this is an actual question.
+# Frozensets, since these are only used for first-word membership tests.
+_INTERROGATIVE_WORDS = frozenset([
+    'what', 'why', 'how', 'when', 'where', 'who', 'which',
+])
+_IMPERATIVE_WORDS = frozenset([
+    'explain', 'describe', 'define', 'compare', 'discuss',
+    'analyze', 'evaluate', 'calculate', 'prepare', 'compute',
+    'determine', 'identify', 'list', 'state', 'illustrate',
+    'justify', 'prove', 'show', 'demonstrate', 'outline'
+])
+_QUESTION_WORDS = _INTERROGATIVE_WORDS | _IMPERATIVE_WORDS
+
+# Words that start a full question rather than a Roman-numeral sub-item
+_SUB_ITEM_QUESTION_WORDS = _INTERROGATIVE_WORDS | frozenset([
+    'explain', 'describe', 'define', 'compare', 'discuss',
+    'analyze', 'evaluate', 'calculate', 'prepare', 'compute'
+])
+
+# Past tense actions that mark transaction/scenario items
+_TRANSACTION_INDICATORS = (
+    'invested', 'purchased', 'paid', 'received', 'sold',
+    'bought', 'acquired', 'issued', 'collected', 'borrowed',
+    'provided', 'completed', 'recorded', 'transferred'
+)
+
+# Phrases showing a question refers to a table or an image
+_TABLE_REFERENCE_KEYWORDS = (
+    'table', 'trial balance', 'balance sheet', 'given below',
+    'following data', 'from the', 'using the data'
+)
+_IMAGE_REFERENCE_KEYWORDS = (
+    'figure', 'diagram', 'chart', 'graph', 'image',
+    'picture', 'illustration', 'shown'
+)
+
+# Phrases that introduce a scenario block
+_SCENARIO_INDICATORS = (
+    'following scenario',
+    'case study',
+    'consider the following',
+    'given the following',
+    'background:',
+    'context:',
+    'scenario:',
+)
+
+# One alternation per keyword list, so each "does the text contain
+# any of these" check is a single scan instead of one per keyword
+_TRANSACTION_WORDS = frozenset(_TRANSACTION_INDICATORS)
+_TRANSACTION_RE = _keyword_regex(_TRANSACTION_INDICATORS)
+_TABLE_REFERENCE_RE = _keyword_regex(_TABLE_REFERENCE_KEYWORDS)
+_IMAGE_REFERENCE_RE = _keyword_regex(_IMAGE_REFERENCE_KEYWORDS)
+_SCENARIO_INDICATOR_RE = _keyword_regex(_SCENARIO_INDICATORS)
+
+
 class AdvancedPDFExtractor:
     """Extracts structured content from PDFs including text, tables, and images."""
 
-    def __init__(self):
-        """Initialize the extractor."""
-        # Match ALL possible question/item patterns (numbers, letters, keywords)
-        # We'll use content analysis to determine if it's actually a question
-        self.question_patterns = [
-            r'^(\d+[\.\)]\s+)',      # 1. or 1) - could be questions or scenarios
-            r'^([a-z][\.\)]\s+)',    # a. or a) - sub-questions
-            r'^([A-Z][\.\)]\s+)',    # A. or A) - sub-questions
-            r'^(Question\s+\d+)',    # Question 1
-            r'^(Problem\s+\d+)',     # Problem 1
-            r'^(Exercise\s+\d+)',    # Exercise 1
-            r'^([ivxIVX]+[\.\)]\s+)', # i., ii., iii. - Roman numerals
-        ]
+    def __init__(self, keep_page_text: bool = True):
+        """
+        Initialize the extractor.
 
-        # Question indicator words that suggest this is an actual question
-        self.question_words = [
-            'what', 'why', 'how', 'when', 'where', 'who', 'which',
-            'explain', 'describe', 'define', 'compare', 'discuss',
-            'analyze', 'evaluate', 'calculate', 'prepare', 'compute',
-            'determine', 'identify', 'list', 'state', 'illustrate',
-            'justify', 'prove', 'show', 'demonstrate', 'outline'
-        ]
+        Args:
+            keep_page_text: Keep each page's 'text' and 'blocks' in the result.
+                When False they are dropped once questions and scenarios are
+                parsed, so long-lived results only hold full_text once.
+        """
+        self.keep_page_text = keep_page_text
+
+        # Kept as attributes for callers of the original API; the parsing
+        # code uses the shared module-level constants directly
+        self.question_patterns = _QUESTION_PATTERNS
+        self.question_words = _QUESTION_WORDS
 
     def extract_structured_content(self, pdf_path: str) -> Dict:
         """
@@ -49,7 +129,7 @@ class AdvancedPDFExtractor:
         doc = fitz.open(pdf_path)
 
         structured_content = {
-            'filename': Path(pdf_path).name,
+            'filename': os.path.basename(pdf_path),
             'pages': [],
             'questions': [],
             'tables': [],
@@ -58,22 +138,19 @@ class AdvancedPDFExtractor:
             'full_text': '',
         }
 
-        all_text = []
-
-        for page_num in range(len(doc)):
+        for page_num in range(doc.page_count):
             page = doc[page_num]
 
             # Extract page content
             page_content = self._extract_page_content(page, page_num)
             structured_content['pages'].append(page_content)
 
-            # Accumulate text
-            all_text.append(page_content['text'])
-
         doc.close()
 
         # Combine all text
-        structured_content['full_text'] = '\n\n'.join(all_text)
+        structured_content['full_text'] = '\n\n'.join(
+            page['text'] for page in structured_content['pages']
+        )
 
         # Identify scenarios FIRST (paragraphs before questions)
         structured_content['scenarios'] = self._identify_scenarios(structured_content)
@@ -81,8 +158,39 @@ class AdvancedPDFExtractor:
         # Parse questions from full text (will use scenarios for enhancement)
         structured_content['questions'] = self._parse_questions(structured_content)
 
+        if not self.keep_page_text:
+            # Page text is only needed for parsing; full_text keeps a copy
+            for page in structured_content['pages']:
+                del page['text']
+                del page['blocks']
+
         return structured_content
 
+    def extract_batch(self, pdf_paths: List[str], workers: Optional[int] = None) -> List[Dict]:
+        """
+        Extract structured content from several PDFs in parallel processes.
+
+        Each PDF is handled by extract_structured_content in a worker process,
+        so the Python-heavy parsing runs outside the GIL. For a single PDF,
+        call extract_structured_content directly instead.
+
+        Args:
+            pdf_paths: Paths to PDF files
+            workers: Number of worker processes (defaults to CPU count)
+
+        Returns:
+            Structured content dictionaries, in the same order as pdf_paths
+        """
+        if len(pdf_paths) <= 1:
+            return [self.extract_structured_content(path) for path in pdf_paths]
+
+        workers = min(workers or os.cpu_count() or 1, len(pdf_paths))
+
+        # Spawn rather than fork: the app process runs other threads
+        # (ChromaDB, gRPC) that aren't safe to fork
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            return pool.map(self.extract_structured_content, pdf_paths)
+
     def _extract_page_content(self, page, page_num: int) -> Dict:
         """
         Extract all content from a single page.
@@ -102,32 +210,25 @@ class AdvancedPDFExtractor:
             'images': [],
         }
 
-        # Extract text blocks with positioning
-        blocks = page.get_text("dict")["blocks"]
+        # Extract text blocks with positioning. "blocks" output has each
+        # block's text already assembled by MuPDF: entries are
+        # (x0, y0, x1, y1, text, block_no, block_type). The "dict" flags give
+        # the same text and block numbering (which counts image blocks) as
+        # walking "dict" spans.
+        blocks = page.get_text("blocks", flags=fitz.TEXTFLAGS_DICT)
 
         text_parts = []
-        for block_num, block in enumerate(blocks):
-            if block['type'] == 0:  # Text block
-                block_text = ""
-                for line in block.get("lines", []):
-                    line_text = ""
-                    for span in line.get("spans", []):
-                        line_text += span.get("text", "")
-                    block_text += line_text + "\n"
-
-                if block_text.strip():
+        for block in blocks:
+            if block[6] == 0:  # Text block
+                block_text = block[4].strip()
+
+                if block_text:
                     content['blocks'].append({
-                        'block_num': block_num,
-                        'text': block_text.strip(),
-                        'bbox': block.get('bbox'),
+                        'block_num': block[5],
+                        'text': block_text,
+                        'bbox': block[:4],
                     })
-                    text_parts.append(block_text.strip())
-
-            elif block['type'] == 1:  # Image block
-                content['images'].append({
-                    'block_num': block_num,
-                    'bbox': block.get('bbox'),
-                })
+                    text_parts.append(block_text)
 
         content['text'] = '\n\n'.join(text_parts)
 
@@ -146,13 +247,14 @@ class AdvancedPDFExtractor:
         except:
             pass  # Tables might not be available in all PyMuPDF versions
 
-        # Extract images
-        image_list = page.get_images()
-        for img_num, img in enumerate(image_list):
-            xref = img[0]
+        # Extract images: one entry per image shown on the page, with both
+        # its position and xref from a single call
+        for img_num, image_info in enumerate(page.get_image_info(xrefs=True)):
             content['images'].append({
                 'img_num': img_num,
-                'xref': xref,
+                'block_num': image_info['number'],
+                'xref': image_info['xref'],
+                'bbox': image_info['bbox'],
                 'page': page_num + 1,
             })
 
@@ -173,21 +275,30 @@ class AdvancedPDFExtractor:
         except:
             return None
 
-    def _is_actual_question(self, text: str) -> bool:
+    def _is_actual_question(
+        self,
+        text: str,
+        text_lower: Optional[str] = None,
+        question_id: Optional[str] = None,
+    ) -> bool:
         """
         Analyze if a numbered/lettered item is actually a question.
 
         Args:
             text: The item text to analyze
+            text_lower: text.lower(), if the caller already has it
+            question_id: Marker ID the text starts with (e.g. "1."), if known
 
         Returns:
             True if it's likely a question, False if it's likely a scenario/transaction
         """
-        text_lower = text.lower()
-
         # Remove the numbering prefix to get the actual content
-        text_without_number = re.sub(r'^[0-9a-zA-Z]+[\.\)]\s*', '', text, flags=re.IGNORECASE)
-        first_word = text_without_number.split()[0].lower() if text_without_number.split() else ''
+        if question_id and self._is_simple_marker_id(question_id):
+            # The prefix regex would remove exactly the known marker, so slice
+            text_without_number = text[len(question_id):].lstrip()
+        else:
+            text_without_number = _NUMBER_PREFIX_RE.sub('', text)
+        first_word = self._first_word(text_without_number)
 
         # Strong indicators it's a question
         # 1. Contains question mark
@@ -195,28 +306,16 @@ class AdvancedPDFExtractor:
             return True
 
         # 2. Starts with interrogative words (what, why, how, etc.)
-        interrogative_words = ['what', 'why', 'how', 'when', 'where', 'who', 'which']
-        if first_word in interrogative_words:
+        if first_word in _INTERROGATIVE_WORDS:
             return True
 
         # 3. Starts with imperative verbs that REQUEST action (not state past actions)
-        imperative_words = [
-            'explain', 'describe', 'define', 'compare', 'discuss',
-            'analyze', 'evaluate', 'calculate', 'prepare', 'compute',
-            'determine', 'identify', 'list', 'state', 'illustrate',
-            'justify', 'prove', 'show', 'demonstrate', 'outline'
-        ]
-        if first_word in imperative_words:
+        if first_word in _IMPERATIVE_WORDS:
             return True
 
         # 4. Check if it contains transaction/scenario indicators (past tense actions)
-        transaction_indicators = [
-            'invested', 'purchased', 'paid', 'received', 'sold',
-            'bought', 'acquired', 'issued', 'collected', 'borrowed',
-            'provided', 'completed', 'recorded', 'transferred'
-        ]
         # If starts with past tense transaction words, it's likely a scenario item
-        if first_word in transaction_indicators:
+        if first_word in _TRANSACTION_WORDS:
             return False
 
         # 5. Check for dollar amounts - usually indicates transactions
@@ -225,44 +324,72 @@ class AdvancedPDFExtractor:
 
         # 6. Very short items (< 100 chars) that don't have clear transaction markers
         if len(text) < 100:
-            has_transaction_words = any(word in text_lower for word in transaction_indicators)
+            if text_lower is None:
+                text_lower = text.lower()
+            has_transaction_words = _TRANSACTION_RE.search(text_lower) is not None
             if not has_transaction_words and not '$' in text:
                 return True
 
         # Default: if none of the above, treat as scenario/context
         return False
 
-    def _is_sub_item(self, question_id: str, line: str) -> bool:
+    def _is_roman_id(self, question_id: str) -> bool:
+        """
+        Check if a marker ID is a Roman numeral like "iii)" or "iv.".
+
+        The marker was already matched by a question pattern, so checking
+        characters is enough; no need to run another regex over it.
         """
-        Check if this is a sub-item (i, ii, iii) of a parent question.
+        return (
+            len(question_id) >= 2
+            and question_id[-1] in '.)'
+            and _ROMAN_CHARS.issuperset(question_id[:-1])
+        )
+
+    @staticmethod
+    def _is_simple_marker_id(question_id: str) -> bool:
+        """Check if a marker ID is ASCII letters/digits followed by '.' or ')'."""
+        body = question_id[:-1]
+        return question_id[-1] in '.)' and body.isascii() and body.isalnum()
+
+    @staticmethod
+    def _first_word(text: str) -> str:
+        """Return the lowercased first whitespace-separated word of text, or ''."""
+        # maxsplit=1 stops after the first word instead of splitting the whole text
+        parts = text.split(None, 1)
+        return parts[0].lower() if parts else ''
+
+    def _classify_line(self, line: str) -> Tuple[Optional[str], bool]:
+        """
+        Classify a stripped line in a single pass over its question marker.
+
+        A line is a sub-item (i, ii, iii) to be merged with its parent
+        question when its marker is a Roman numeral followed by '.' or ')'
+        (e.g. "iii)" or "i."), the line is shorter than 100 characters, and
+        the text after the marker doesn't start with a question word.
 
         Args:
-            question_id: The matched pattern ID (e.g., "iii)")
-            line: The full line text
+            line: Stripped line of text
 
         Returns:
-            True if this is a sub-item that should be merged with parent
+            Tuple of (question ID or None if the line doesn't start a
+            question, whether it is a Roman-numeral sub-item)
         """
-        # Check if it's a Roman numeral (just the ID without extra characters)
-        # question_id will be like "iii)" or "i."
-        if re.match(r'^[ivxIVX]+[\.\)]$', question_id.strip()):
-            # If the line is very short (< 100 chars) and doesn't start with question words,
-            # it's likely a sub-item continuation
-            if len(line) < 100:
-                text_without_number = re.sub(r'^[ivxIVX]+[\.\)]\s*', '', line, flags=re.IGNORECASE)
-                first_word = text_without_number.split()[0].lower() if text_without_number.split() else ''
-
-                interrogative_words = ['what', 'why', 'how', 'when', 'where', 'who', 'which']
-                imperative_words = [
-                    'explain', 'describe', 'define', 'compare', 'discuss',
-                    'analyze', 'evaluate', 'calculate', 'prepare', 'compute'
-                ]
-
-                # If doesn't start with question word, it's a sub-item
-                if first_word not in interrogative_words and first_word not in imperative_words:
-                    return True
+        match = self._match_question_start(line)
+        if match is None:
+            return None, False
 
-        return False
+        question_id = match.group(match.lastindex).strip()
+
+        # Every marker pattern ends by consuming the whitespace after it, so
+        # the item text starts at match.end()
+        is_sub_item = (
+            len(line) < 100
+            and self._is_roman_id(question_id)
+            and self._first_word(line[match.end():]) not in _SUB_ITEM_QUESTION_WORDS
+        )
+
+        return question_id, is_sub_item
 
     def _parse_questions(self, structured_content: Dict) -> List[Dict]:
         """
@@ -275,10 +402,14 @@ class AdvancedPDFExtractor:
             List of question dictionaries
         """
         questions = []
-        full_text = structured_content['full_text']
 
-        # Split by common question patterns
-        lines = full_text.split('\n')
+        # Walk each page's lines directly rather than re-splitting full_text,
+        # which is just the page texts joined by blank lines
+        lines = (
+            line
+            for page in structured_content['pages']
+            for line in page['text'].split('\n')
+        )
 
         current_question = None
         current_text = []
@@ -289,19 +420,11 @@ class AdvancedPDFExtractor:
                 continue
 
             # Check if line starts with a question marker
-            is_question_start = False
-            question_id = None
-
-            for pattern in self.question_patterns:
-                match = re.match(pattern, line, re.IGNORECASE)
-                if match:
-                    is_question_start = True
-                    question_id = match.group(1).strip()
-                    break
+            question_id, is_sub_item = self._classify_line(line)
 
-            if is_question_start:
+            if question_id is not None:
                 # Check if this is a sub-item that should be merged with the previous question
-                if self._is_sub_item(question_id, line) and current_question:
+                if is_sub_item and current_question:
                     # This is a sub-item (like "iii) bonus shares") - merge with current question
                     current_text.append(line)
                     continue
@@ -310,7 +433,7 @@ class AdvancedPDFExtractor:
                 if current_question and current_text:
                     full_item_text = '\n'.join(current_text)
                     # Only add if it's actually a question (not a scenario item)
-                    if self._is_actual_question(full_item_text):
+                    if self._is_actual_question(full_item_text, question_id=current_question['id']):
                         current_question['text'] = full_item_text
                         questions.append(current_question)
 
@@ -331,64 +454,49 @@ class AdvancedPDFExtractor:
         # Save last question if it's actually a question
         if current_question and current_text:
             full_item_text = '\n'.join(current_text)
-            if self._is_actual_question(full_item_text):
+            if self._is_actual_question(full_item_text, question_id=current_question['id']):
                 current_question['text'] = full_item_text
                 questions.append(current_question)
 
-        # Enhance questions with context
+        # Enhance questions with context. What the document contains is the
+        # same for every question, so look it up once.
+        pages = structured_content['pages']
+        has_tables = any(page['tables'] for page in pages)
+        has_images = any(page['images'] for page in pages)
+        has_scenarios = bool(structured_content.get('scenarios'))
         for question in questions:
-            self._enhance_question_context(question, structured_content)
+            self._enhance_question_context(question, has_tables, has_images, has_scenarios)
 
         return questions
 
-    def _enhance_question_context(self, question: Dict, structured_content: Dict):
+    def _enhance_question_context(
+        self, question: Dict, has_tables: bool, has_images: bool, has_scenarios: bool
+    ):
         """
         Enhance question with context about tables, images, scenarios based on PDF structure.
         Only mark if the element is actually related to THIS specific question.
 
         Args:
             question: Question dictionary
-            structured_content: Full structured content
+            has_tables: Whether the PDF contains any tables
+            has_images: Whether the PDF contains any images
+            has_scenarios: Whether any scenario blocks were detected
         """
-        question_text_lower = question['text'].lower()
-
-        # Check for TABLES - only if question explicitly references table/data
-        table_reference_keywords = [
-            'table', 'trial balance', 'balance sheet', 'given below',
-            'following data', 'from the', 'using the data'
-        ]
-
-        has_table_reference = any(keyword in question_text_lower for keyword in table_reference_keywords)
+        # Keyword checks can only change anything if the PDF has tables/images
+        if has_tables or has_images:
+            question_text_lower = question['text'].lower()
 
-        if has_table_reference:
-            # Check if there are actual tables in the PDF
-            all_tables = []
-            for page in structured_content['pages']:
-                all_tables.extend(page.get('tables', []))
-
-            if len(all_tables) > 0:
+            # Check for TABLES - only if question explicitly references table/data
+            if has_tables and _TABLE_REFERENCE_RE.search(question_text_lower):
                 question['has_table'] = True
 
-        # Check for IMAGES - only if question explicitly references images/figures
-        image_reference_keywords = [
-            'figure', 'diagram', 'chart', 'graph', 'image',
-            'picture', 'illustration', 'shown'
-        ]
-
-        has_image_reference = any(keyword in question_text_lower for keyword in image_reference_keywords)
-
-        if has_image_reference:
-            # Check if there are actual images in the PDF
-            all_images = []
-            for page in structured_content['pages']:
-                all_images.extend(page.get('images', []))
-
-            if len(all_images) > 0:
+            # Check for IMAGES - only if question explicitly references images/figures
+            if has_images and _IMAGE_REFERENCE_RE.search(question_text_lower):
                 question['has_image'] = True
 
         # Check if there's a SCENARIO (numbered transaction list before questions)
         # A question has scenario context if there are scenario blocks detected
-        if len(structured_content.get('scenarios', [])) > 0:
+        if has_scenarios:
             question['has_scenario'] = True
 
     def _identify_scenarios(self, structured_content: Dict) -> List[Dict]:
@@ -434,49 +542,50 @@ class AdvancedPDFExtractor:
         """Check if text block is likely a scenario based on PDF structure and content."""
         text_lower = text.lower()
 
-        scenario_indicators = [
-            'following scenario',
-            'case study',
-            'consider the following',
-            'given the following',
-            'background:',
-            'context:',
-            'scenario:',
-        ]
-
         # Check for explicit indicators
-        for indicator in scenario_indicators:
-            if indicator in text_lower:
-                return True
+        if _SCENARIO_INDICATOR_RE.search(text_lower):
+            return True
 
         # Check if it's a numbered item that's NOT an actual question
         # (i.e., transaction descriptions like "1. Stockholders invested...")
-        import re
-        if re.match(r'^\d+[\.\)]\s+', text.strip()):
+        if _NUMBERED_ITEM_RE.match(text.strip()):
             # It's numbered - check if it's actually a question or a scenario
-            if not self._is_actual_question(text):
+            if not self._is_actual_question(text, text_lower):
                 return True
 
         # Check if it's a longer paragraph (likely context) and not a question
-        if len(text) > 200 and not self._is_question_start(text) and not self._is_actual_question(text):
+        if len(text) > 200 and not self._is_question_start(text) and not self._is_actual_question(text, text_lower):
             return True
 
         return False
 
     def _is_question_start(self, text: str) -> bool:
         """Check if text starts with a question marker."""
-        for pattern in self.question_patterns:
-            if re.match(pattern, text.strip(), re.IGNORECASE):
-                return True
-        return False
+        return self._match_question_start(text.strip()) is not None
+
+    def _match_question_start(self, text: str) -> Optional[re.Match]:
+        """
+        Match the first question marker pattern at the start of text.
 
-    def extract_images(self, pdf_path: str, output_dir: Optional[str] = None) -> List[Dict]:
+        The marker itself is match.group(match.lastindex).
+        """
+        return _QUESTION_START_RE.match(text)
+
+    def extract_images(
+        self,
+        pdf_path: str,
+        output_dir: Optional[str] = None,
+        include_base64: bool = True,
+    ) -> List[Dict]:
         """
         Extract all images from PDF and optionally save them.
 
         Args:
             pdf_path: Path to PDF
             output_dir: Directory to save images (optional)
+            include_base64: When not saving to disk, add each image's data
+                as base64. Pass False if only the metadata is needed, to
+                skip encoding (and holding) every image in memory.
 
         Returns:
             List of image information dictionaries
@@ -488,7 +597,7 @@ class AdvancedPDFExtractor:
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
 
-        for page_num in range(len(doc)):
+        for page_num in range(doc.page_count):
             page = doc[page_num]
             image_list = page.get_images()
 
@@ -516,7 +625,7 @@ class AdvancedPDFExtractor:
                         with open(image_path, "wb") as f:
                             f.write(image_bytes)
                         img_info['saved_path'] = str(image_path)
-                    else:
+                    elif include_base64:
                         # Store as base64 if not saving to disk
                         img_info['base64'] = base64.b64encode(image_bytes).decode('utf-8')
 
@@ -537,6 +646,14 @@ class AdvancedPDFExtractor:
             List of chunk dictionaries ready for vector store
         """
         chunks = []
+        # Scenario texts already included in a chunk
+        used_scenarios = set()
+        # Every question with a table gets the same (last) table, so it is
+        # formatted once, the first time a question needs it
+        shared_table_text = None
+        all_tables = [
+            table for page in structured_content['pages'] for table in page['tables']
+        ]
 
         # Create chunks for each question with full context
         for question in structured_content['questions']:
@@ -552,12 +669,14 @@ class AdvancedPDFExtractor:
             )
             if scenario_text:
                 chunk_text_parts.insert(0, f"Context/Scenario:\n{scenario_text}")
+                used_scenarios.add(scenario_text)
 
             # Find and add relevant table
-            table_text = self._find_relevant_table(
-                question,
-                structured_content
-            )
+            table_text = None
+            if question.get('has_table'):
+                if shared_table_text is None:
+                    shared_table_text = self._find_relevant_table(question, all_tables)
+                table_text = shared_table_text
             if table_text:
                 chunk_text_parts.insert(1 if scenario_text else 0, f"Table:\n{table_text}")
 
@@ -575,18 +694,28 @@ class AdvancedPDFExtractor:
             }
             chunks.append(chunk)
 
+        # All chunk text in one string (NUL-separated so matches can't span
+        # chunks), so the containment check below is a single C-level search
+        # instead of a Python loop over every chunk
+        included_text = '\0'.join(chunk['text'] for chunk in chunks)
+
         # Also create chunks for standalone scenarios
         for scenario in structured_content['scenarios']:
-            # Only add if not already included with a question
-            if not any(scenario['text'] in chunk['text'] for chunk in chunks):
-                chunk = {
-                    'text': f"Context/Background:\n{scenario['text']}",
-                    'metadata': {
-                        'type': 'scenario',
-                        'page': scenario['page'],
-                    }
+            # Only add if not already included with a question (or as part
+            # of an earlier, overlapping scenario)
+            if scenario['text'] in used_scenarios or scenario['text'] in included_text:
+                continue
+
+            used_scenarios.add(scenario['text'])
+            chunk = {
+                'text': f"Context/Background:\n{scenario['text']}",
+                'metadata': {
+                    'type': 'scenario',
+                    'page': scenario['page'],
                 }
-                chunks.append(chunk)
+            }
+            chunks.append(chunk)
+            included_text += '\0' + chunk['text']
 
         return chunks
 
@@ -603,16 +732,11 @@ class AdvancedPDFExtractor:
 
         return None
 
-    def _find_relevant_table(self, question: Dict, structured_content: Dict) -> Optional[str]:
-        """Find table relevant to a question."""
+    def _find_relevant_table(self, question: Dict, all_tables: List[Dict]) -> Optional[str]:
+        """Find table relevant to a question among all the document's tables."""
         if not question.get('has_table'):
             return None
 
-        # Find tables in the document
-        all_tables = []
-        for page in structured_content['pages']:
-            all_tables.extend(page['tables'])
-
         if not all_tables:
             return None
 
@@ -628,6 +752,11 @@ class AdvancedPDFExtractor:
         # Create a simple text representation
         lines = []
         for row in table_data:
-            lines.append(" | ".join(str(cell) if cell else "" for cell in row))
+            try:
+                # Rows of plain strings can be joined directly in C
+                lines.append(" | ".join(row))
+            except TypeError:
+                # Empty cells come back as None
+                lines.append(" | ".join(str(cell) if cell else "" for cell in row))
 
         return "\n".join(lines)
@@ -1,9 +1,12 @@
 """
 Chat manager for in-memory conversation storage.
 """
+from collections import OrderedDict, deque
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import time
 import uuid
+from ..utils.clock import iso_now
 
 
 class ChatManager:
@@ -13,18 +16,48 @@ class ChatManager:
         self,
         max_history_length: int = 20,
         session_timeout_minutes: int = 60,
+        max_sessions: int = 10_000,
     ):
         """
         Initialize chat manager.
 
+        Sessions are kept in least-recently-active order, so expired sessions
+        are always at the front and can be evicted without scanning the rest.
+
         Args:
             max_history_length: Maximum number of messages to keep per session
             session_timeout_minutes: Minutes before a session is considered expired
+            max_sessions: Maximum number of sessions kept in memory
         """
-        self.sessions: Dict[str, Dict] = {}
+        self.sessions: "OrderedDict[str, Dict]" = OrderedDict()
         self.max_history_length = max_history_length
-        self.session_timeout = timedelta(minutes=session_timeout_minutes)
-        print(f"✓ Chat Manager initialized (max history: {max_history_length}, timeout: {session_timeout_minutes}m)")
+        # Activity times are kept as time.time_ns() integers and only
+        # formatted as datetimes when session info is requested
+        self.session_timeout_ns = session_timeout_minutes * 60 * 1_000_000_000
+        self.max_sessions = max_sessions
+        print(f"✓ Chat Manager initialized (max history: {max_history_length}, timeout: {session_timeout_minutes}m, max sessions: {max_sessions})")
+
+    def _touch(self, session_id: str) -> None:
+        """Mark a session as just active, moving it to the back of the order."""
+        self.sessions[session_id]["last_activity_ns"] = time.time_ns()
+        self.sessions.move_to_end(session_id)
+
+    def _expired_prefix(self, now_ns: int) -> List[str]:
+        """
+        Get expired session IDs from the front of the activity order.
+
+        Args:
+            now_ns: Current time from time.time_ns()
+
+        Returns:
+            IDs of expired sessions, oldest first
+        """
+        expired = []
+        for sid, data in self.sessions.items():
+            if now_ns - data["last_activity_ns"] <= self.session_timeout_ns:
+                break
+            expired.append(sid)
+        return expired
 
     def create_session(self) -> str:
         """
@@ -33,11 +66,17 @@ class ChatManager:
         Returns:
             Unique session ID
         """
+        # Lazily drop expired sessions and enforce the session limit
+        self.cleanup_expired_sessions()
+        while len(self.sessions) >= self.max_sessions:
+            self.sessions.popitem(last=False)
+
         session_id = str(uuid.uuid4())
         self.sessions[session_id] = {
-            "messages": [],
+            # Bounded deque: appending past max_history_length drops the oldest
+            "messages": deque(maxlen=self.max_history_length),
             "created_at": datetime.now(),
-            "last_activity": datetime.now(),
+            "last_activity_ns": time.time_ns(),
         }
         print(f"Created new session: {session_id}")
         return session_id
@@ -61,19 +100,12 @@ class ChatManager:
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": iso_now(),
         }
         self.sessions[session_id]["messages"].append(message)
 
         # Update last activity
-        self.sessions[session_id]["last_activity"] = datetime.now()
-
-        # Trim history if it exceeds max length
-        if len(self.sessions[session_id]["messages"]) > self.max_history_length:
-            # Keep only the most recent messages
-            self.sessions[session_id]["messages"] = self.sessions[session_id]["messages"][
-                -self.max_history_length :
-            ]
+        self._touch(session_id)
 
     def get_history(self, session_id: str) -> List[Dict[str, str]]:
         """
@@ -91,7 +123,7 @@ class ChatManager:
         if session_id not in self.sessions:
             raise ValueError(f"Session {session_id} not found")
 
-        return self.sessions[session_id]["messages"]
+        return list(self.sessions[session_id]["messages"])
 
     def get_recent_history(
         self, session_id: str, count: int = 10
@@ -125,8 +157,8 @@ class ChatManager:
         if session_id not in self.sessions:
             raise ValueError(f"Session {session_id} not found")
 
-        self.sessions[session_id]["messages"] = []
-        self.sessions[session_id]["last_activity"] = datetime.now()
+        self.sessions[session_id]["messages"].clear()
+        self._touch(session_id)
         print(f"Cleared history for session: {session_id}")
 
     def delete_session(self, session_id: str) -> None:
@@ -165,22 +197,19 @@ class ChatManager:
         if session_id not in self.sessions:
             return True
 
-        last_activity = self.sessions[session_id]["last_activity"]
-        return datetime.now() - last_activity > self.session_timeout
+        last_activity_ns = self.sessions[session_id]["last_activity_ns"]
+        return time.time_ns() - last_activity_ns > self.session_timeout_ns
 
     def cleanup_expired_sessions(self) -> int:
         """
         Remove expired sessions to prevent memory bloat.
 
+        Only the expired prefix of the activity order is visited.
+
         Returns:
             Number of sessions cleaned up
         """
-        now = datetime.now()
-        expired_sessions = [
-            sid
-            for sid, data in self.sessions.items()
-            if now - data["last_activity"] > self.session_timeout
-        ]
+        expired_sessions = self._expired_prefix(time.time_ns())
 
         for sid in expired_sessions:
             del self.sessions[sid]
@@ -208,7 +237,7 @@ class ChatManager:
             "session_id": session_id,
             "message_count": len(session["messages"]),
             "created_at": session["created_at"].isoformat(),
-            "last_activity": session["last_activity"].isoformat(),
+            "last_activity": datetime.fromtimestamp(session["last_activity_ns"] / 1e9).isoformat(),
             "is_expired": self.is_session_expired(session_id),
         }
 
@@ -219,18 +248,29 @@ class ChatManager:
         Returns:
             Dictionary with session statistics
         """
-        total_messages = sum(
-            len(session["messages"]) for session in self.sessions.values()
-        )
-        active_sessions = sum(
-            1 for sid in self.sessions if not self.is_session_expired(sid)
-        )
+        now_ns = time.time_ns()
+        total_sessions = len(self.sessions)
+        total_messages = 0
+        expired_sessions = 0
+        in_expired_prefix = True
+
+        # One pass: count messages everywhere, and expired sessions only
+        # until the first live one (sessions are in activity order)
+        for session in self.sessions.values():
+            total_messages += len(session["messages"])
+            if in_expired_prefix:
+                if now_ns - session["last_activity_ns"] > self.session_timeout_ns:
+                    expired_sessions += 1
+                else:
+                    in_expired_prefix = False
+
+        active_sessions = total_sessions - expired_sessions
 
         return {
-            "total_sessions": len(self.sessions),
+            "total_sessions": total_sessions,
             "active_sessions": active_sessions,
             "total_messages": total_messages,
             "avg_messages_per_session": (
-                total_messages / len(self.sessions) if self.sessions else 0
+                total_messages / total_sessions if total_sessions else 0
             ),
         }
@@ -0,0 +1,99 @@
+"""
+Embedding functions for the vector store.
+"""
+from functools import cached_property
+from typing import Any, List, Optional
+import os
+
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+
+class QuantizedMiniLM(ONNXMiniLM_L6_V2):
+    """
+    Chroma's default all-MiniLM-L6-v2 ONNX model, dynamically quantized to int8.
+
+    Embeddings stay compatible with collections built by the default FP32
+    model (same model and tokenizer; cosine similarity between the two
+    is ~0.99), but CPU inference is roughly twice as fast.
+    """
+
+    QUANTIZED_MODEL_NAME = "model_int8.onnx"
+
+    @staticmethod
+    def name() -> str:
+        # Report as Chroma's default function so existing collections
+        # (persisted with "default") open without a configuration conflict
+        return "default"
+
+    def _quantized_model_path(self) -> str:
+        """
+        Quantize the downloaded FP32 model once and return the int8 model path.
+
+        Returns:
+            Path to the int8 model, or the FP32 model if quantization
+            is unavailable
+        """
+        model_dir = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        int8_path = os.path.join(model_dir, self.QUANTIZED_MODEL_NAME)
+
+        if os.path.exists(int8_path):
+            return int8_path
+
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp_path = int8_path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+            print(f"✓ Quantized embedding model to int8 ({int8_path})")
+            return int8_path
+        except Exception as e:
+            print(f"⚠️  Could not quantize embedding model, using FP32: {str(e)}")
+            return fp32_path
+
+    @cached_property
+    def model(self) -> Any:
+        """ONNX Runtime session for the int8 model."""
+        # Ensure model.onnx is present before quantizing it
+        self._download_model_if_not_exists()
+
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        return self.ort.InferenceSession(
+            self._quantized_model_path(),
+            providers=["CPUExecutionProvider"],
+            sess_options=so,
+        )
+
+
+class CudaMiniLM(ONNXMiniLM_L6_V2):
+    """
+    Chroma's default all-MiniLM-L6-v2 ONNX model, run on a CUDA GPU.
+
+    Uses the FP32 model, since the dynamically quantized int8 operators
+    have no CUDA kernels, and larger inference batches than on CPU.
+    Requires the onnxruntime-gpu package.
+    """
+
+    BATCH_SIZE = 128
+
+    def __init__(self) -> None:
+        super().__init__(preferred_providers=["CUDAExecutionProvider", "CPUExecutionProvider"])
+
+    @staticmethod
+    def name() -> str:
+        # Same embeddings as Chroma's default function, see QuantizedMiniLM
+        return "default"
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether ONNX Runtime can run on a CUDA GPU."""
+        import onnxruntime
+
+        return "CUDAExecutionProvider" in onnxruntime.get_available_providers()
+
+    def _forward(self, documents: List[str], batch_size: Optional[int] = None) -> Any:
+        return super()._forward(documents, batch_size=batch_size or self.BATCH_SIZE)
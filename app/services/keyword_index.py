@@ -0,0 +1,119 @@
+"""
+Keyword (BM25) search over document chunks using SQLite FTS5.
+"""
+from typing import Dict, List, Set, Tuple
+import json
+import re
+import sqlite3
+import threading
+
+
+class KeywordIndex:
+    """In-memory FTS5 index used alongside the vector store for exact-term matches."""
+
+    _TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self):
+        """Initialize an empty in-memory FTS5 index."""
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE chunks USING fts5(chunk_id UNINDEXED, text, metadata UNINDEXED)"
+        )
+        self._lock = threading.Lock()
+
+        # FTS5 can only look rows up quickly by rowid, so rowids are
+        # assigned here and tracked per chunk ID and per source
+        self._next_rowid = 1
+        self._rows: Dict[str, Tuple[int, str]] = {}  # chunk_id: (rowid, source)
+        self._source_chunks: Dict[str, Set[str]] = {}  # source: chunk_ids
+
+    def add_documents(self, texts: List[str], metadatas: List[Dict], ids: List[str]) -> None:
+        """
+        Add document chunks to the index, replacing any with the same IDs.
+
+        Args:
+            texts: List of text chunks
+            metadatas: List of metadata dicts for each chunk
+            ids: List of unique IDs for each chunk
+        """
+        if not texts:
+            return
+
+        with self._lock, self._conn:
+            self._delete_chunks([chunk_id for chunk_id in ids if chunk_id in self._rows])
+
+            rows = []
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                rowid = self._next_rowid
+                self._next_rowid += 1
+                source = metadata.get("source", "")
+                self._rows[chunk_id] = (rowid, source)
+                self._source_chunks.setdefault(source, set()).add(chunk_id)
+                rows.append((rowid, chunk_id, text, json.dumps(metadata)))
+
+            self._conn.executemany(
+                "INSERT INTO chunks (rowid, chunk_id, text, metadata) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_by_source(self, source: str) -> None:
+        """
+        Remove all chunks from a specific source.
+
+        Args:
+            source: Source filename to delete
+        """
+        with self._lock, self._conn:
+            self._delete_chunks(list(self._source_chunks.get(source, ())))
+
+    def _delete_chunks(self, chunk_ids: List[str]) -> None:
+        """Delete indexed chunks by ID; the caller must hold the lock."""
+        rowids = []
+        for chunk_id in chunk_ids:
+            rowid, source = self._rows.pop(chunk_id)
+            rowids.append((rowid,))
+            source_chunks = self._source_chunks[source]
+            source_chunks.discard(chunk_id)
+            if not source_chunks:
+                del self._source_chunks[source]
+        self._conn.executemany("DELETE FROM chunks WHERE rowid = ?", rowids)
+
+    def search(self, query: str, n_results: int = 20) -> List[Dict]:
+        """
+        Search chunks by keyword relevance (BM25).
+
+        Args:
+            query: Search query
+            n_results: Number of results to return
+
+        Returns:
+            List of matching chunks (best first) with id, text and metadata
+        """
+        # Quote each term so user input can't be parsed as FTS5 syntax
+        terms = self._TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+        match_expr = " OR ".join(f'"{term}"' for term in terms)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT chunk_id, text, metadata FROM chunks "
+                    "WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+                    (match_expr, n_results),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching keyword index: {str(e)}")
+            return []
+
+        return [
+            {"id": chunk_id, "text": text, "metadata": json.loads(metadata)}
+            for chunk_id, text, metadata in rows
+        ]
+
+    def clear(self) -> None:
+        """Remove all chunks from the index."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._rows.clear()
+            self._source_chunks.clear()
@@ -1,65 +1,163 @@
 """
 Knowledge base management service for loading and organizing PDF content.
 """
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import orjson
 from .pdf_processor import PDFProcessor
 from .vector_store import VectorStore
+from .keyword_index import KeywordIndex
+from .reranker import Reranker
 from .advanced_pdf_extractor import AdvancedPDFExtractor
 
 
 class KnowledgeBase:
     """Manages loading and organizing class materials and assignments from PDFs."""
 
-    def __init__(self, data_dir: str, use_vector_store: bool = True):
+    # Candidates fetched from each search before hybrid fusion
+    HYBRID_CANDIDATES = 20
+    # Minimum chunks per vector store add() call when loading PDFs in bulk
+    ADD_BATCH_SIZE = 128
+    # Version of the extraction output stored in data/extract_cache. Bump it
+    # whenever PDFProcessor.extract_text or
+    # AdvancedPDFExtractor.extract_structured_content changes what it
+    # returns, so cached extractions from older code are not reused.
+    EXTRACT_CACHE_VERSION = 2
+
+    def __init__(
+        self,
+        data_dir: str,
+        use_vector_store: bool = True,
+        reranker: Optional[Reranker] = None,
+        quantize_embeddings: bool = True,
+        load_workers: int = 1,
+        vector_add_batch_size: int = 200,
+        embedding_device: str = "cpu",
+        hnsw_m: int = 24,
+        hnsw_construction_ef: int = 128,
+        hnsw_search_ef: int = 64,
+        query_cache_size: int = 512,
+        query_cache_threshold: float = 0.97,
+    ):
         """
         Initialize knowledge base.
 
         Args:
             data_dir: Root directory containing PDF files
             use_vector_store: Whether to use vector store for semantic search
+            reranker: Optional cross-encoder used to pick the final chunks
+            quantize_embeddings: Use the int8-quantized embedding model
+            load_workers: Processes used to extract a directory's PDFs in
+                parallel (1 = extract in this process, 0 = one per CPU)
+            vector_add_batch_size: Maximum chunks per ChromaDB add() call
+            embedding_device: Device to compute embeddings on ("cpu" or "cuda")
+            hnsw_m: Maximum neighbors per node in the vector store's HNSW graph
+            hnsw_construction_ef: HNSW candidate list size while building
+            hnsw_search_ef: HNSW candidate list size while searching
+            query_cache_size: Vector searches kept for near-duplicate queries
+            query_cache_threshold: Cosine similarity at which a cached vector
+                search is reused
         """
         self.data_dir = Path(data_dir)
+        self.reranker = reranker
+        self.load_workers = load_workers or os.cpu_count() or 1
         self.processor = PDFProcessor(chunk_size=1000, chunk_overlap=200)
-        self.advanced_extractor = AdvancedPDFExtractor()  # For assignments
+        # For assignments; structures are kept for the process lifetime, so
+        # don't keep a per-page copy of the text alongside full_text
+        self.advanced_extractor = AdvancedPDFExtractor(keep_page_text=False)
         self.materials: Dict[str, str] = {}  # filename: content
         self.assignments: Dict[str, str] = {}  # filename: content
         self.assignment_structures: Dict[str, Dict] = {}  # filename: structured content
         self.load_errors: List[str] = []
         self.use_vector_store = use_vector_store
 
-        # Initialize vector store if enabled
+        # Joined context strings by kind ("all", "materials", "assignments"),
+        # each tagged with the content version it was built from. The version
+        # is bumped whenever a PDF's content is stored.
+        self._content_version = 0
+        self._context_cache: Dict[str, Tuple[int, str]] = {}
+        self.ready = False  # Set once load_pdfs() has finished
+        self.load_failed = False  # Set if load_pdfs() stopped on an error
+
+        # Serializes everything that changes the loaded content (load_pdfs,
+        # add_single_pdf), since both run in worker threads
+        self._write_lock = threading.Lock()
+
+        # Serialized /api/assignment-questions payload and its ETag, rebuilt
+        # whenever the loaded assignments change
+        self.assignment_index: Tuple[bytes, str] = (b"", "")
+        self.build_assignment_index()
+
+        # Initialize vector store (and keyword index for hybrid search) if enabled
         self.vector_store: Optional[VectorStore] = None
+        self.keyword_index: Optional[KeywordIndex] = None
         if self.use_vector_store:
-            self.vector_store = VectorStore(persist_directory=str(self.data_dir / "chromadb"))
+            self.vector_store = VectorStore(
+                persist_directory=str(self.data_dir / "chromadb"),
+                quantize_embeddings=quantize_embeddings,
+                add_batch_size=vector_add_batch_size,
+                embedding_device=embedding_device,
+                hnsw_m=hnsw_m,
+                hnsw_construction_ef=hnsw_construction_ef,
+                hnsw_search_ef=hnsw_search_ef,
+                query_cache_size=query_cache_size,
+                query_cache_threshold=query_cache_threshold,
+            )
+            self.keyword_index = KeywordIndex()
 
     def load_pdfs(self):
         """
         Load and process all PDFs from materials and assignments directories.
 
-        This method is called at application startup to load all PDF content
-        into memory for fast access.
+        This method is run in the background after application startup to
+        load all PDF content into memory for fast access. `ready` is set
+        once loading has finished, even if it failed part way; in that case
+        `load_failed` is set, the error is recorded in `load_errors` and
+        re-raised, and whatever was loaded stays available.
         """
+        with self._write_lock:
+            try:
+                self._load_all()
+            except Exception as e:
+                self.load_failed = True
+                self.load_errors.append(f"PDF loading failed: {str(e)}")
+                raise
+            finally:
+                self.ready = True
+
+    def _load_all(self):
+        """Load both PDF directories; the caller must hold the write lock."""
         print("=" * 60)
         print("Loading PDFs into knowledge base...")
         print("=" * 60)
 
-        # Load class materials
-        materials_dir = self.data_dir / "pdfs" / "materials"
-        if materials_dir.exists():
-            self._load_directory(materials_dir, self.materials, "Class Materials")
-        else:
-            print(f"⚠️  Materials directory not found: {materials_dir}")
-            print("   Please create it and add your class material PDFs.")
+        # Chunks waiting to be added to the vector store. Whole PDFs are
+        # buffered until there are ADD_BATCH_SIZE chunks, so several small
+        # PDFs share one add() call.
+        pending_adds = self._new_pending_adds()
+        try:
+            # Load class materials
+            materials_dir = self.data_dir / "pdfs" / "materials"
+            if materials_dir.exists():
+                self._load_directory(materials_dir, self.materials, "Class Materials", pending_adds)
+            else:
+                print(f"⚠️  Materials directory not found: {materials_dir}")
+                print("   Please create it and add your class material PDFs.")
 
-        # Load assignments
-        assignments_dir = self.data_dir / "pdfs" / "assignments"
-        if assignments_dir.exists():
-            self._load_directory(assignments_dir, self.assignments, "Assignments")
-        else:
-            print(f"⚠️  Assignments directory not found: {assignments_dir}")
-            print("   Please create it and add your assignment PDFs.")
+            # Load assignments
+            assignments_dir = self.data_dir / "pdfs" / "assignments"
+            if assignments_dir.exists():
+                self._load_directory(assignments_dir, self.assignments, "Assignments", pending_adds)
+            else:
+                print(f"⚠️  Assignments directory not found: {assignments_dir}")
+                print("   Please create it and add your assignment PDFs.")
+        finally:
+            self._flush_vector_adds(pending_adds)
 
         # Summary
         print("=" * 60)
@@ -71,7 +169,15 @@ class KnowledgeBase:
                 print(f"   - {error}")
         print("=" * 60)
 
-    def _load_directory(self, directory: Path, storage: Dict[str, str], category: str):
+        self.build_assignment_index()
+
+    def _load_directory(
+        self,
+        directory: Path,
+        storage: Dict[str, str],
+        category: str,
+        pending_adds: Optional[Dict[str, list]] = None,
+    ):
         """
         Load all PDFs from a specific directory.
 
@@ -79,6 +185,8 @@ class KnowledgeBase:
             directory: Directory to scan for PDFs
             storage: Dictionary to store loaded content
             category: Category name for logging
+            pending_adds: Buffer to collect vector store adds in (see
+                _new_pending_adds), or None to add each PDF directly
         """
         pdf_files = list(directory.glob("*.pdf"))
 
@@ -90,28 +198,92 @@ class KnowledgeBase:
 
         # Check if this is assignments directory (use advanced extractor)
         is_assignment = "assignment" in category.lower()
-
+        extract = (
+            self.advanced_extractor.extract_structured_content
+            if is_assignment
+            else self.processor.extract_text
+        )
+
+        # Reuse the previous extraction of any PDF whose bytes are unchanged,
+        # if it was made by the same extraction code and options
+        cache_dir = self.data_dir / "extract_cache" / directory.name
+        cache_version = str(self.EXTRACT_CACHE_VERSION)
+        if is_assignment:
+            cache_version += f"-page_text={int(self.advanced_extractor.keep_page_text)}"
+        doc_hashes = []
+        cached = []
         for pdf_file in pdf_files:
             try:
-                print(f"   Loading: {pdf_file.name}...", end=" ")
-
-                if is_assignment:
-                    # Use advanced extractor for assignments
-                    self._load_assignment_pdf(pdf_file, storage, category)
-                else:
-                    # Use regular extractor for class materials
-                    self._load_material_pdf(pdf_file, storage, category)
-
-            except Exception as e:
-                print(f"✗ ERROR")
-                error_msg = f"{pdf_file.name}: {str(e)}"
-                self.load_errors.append(error_msg)
-                print(f"   Error details: {str(e)}")
+                doc_hash = self._file_hash(pdf_file)
+            except OSError:
+                doc_hash = None  # Reported when the file is loaded below
+            doc_hashes.append(doc_hash)
+            cached.append(self._read_extract_cache(
+                cache_dir / f"{pdf_file.name}.json", doc_hash, cache_version
+            ))
+
+        # Extraction is CPU-bound, so fan it out to worker processes; storing
+        # and indexing the results stays in this process, in file order.
+        # Spawn rather than fork: this process runs ChromaDB and gRPC threads
+        # that aren't safe to fork.
+        to_extract = [pdf_file for pdf_file, hit in zip(pdf_files, cached) if hit is None]
+        workers = min(self.load_workers, len(to_extract))
+        executor = None
+        futures = {}
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            futures = {
+                pdf_file: executor.submit(extract, str(pdf_file)) for pdf_file in to_extract
+            }
 
-    def _load_material_pdf(self, pdf_file: Path, storage: Dict[str, str], category: str):
-        """Load class material PDF with regular chunking."""
+        try:
+            for pdf_file, doc_hash, extracted in zip(pdf_files, doc_hashes, cached):
+                try:
+                    print(f"   Loading: {pdf_file.name}...", end=" ")
+
+                    if extracted is None:
+                        future = futures.get(pdf_file)
+                        extracted = future.result() if future else extract(str(pdf_file))
+                        if doc_hash is not None:
+                            self._write_extract_cache(
+                                cache_dir / f"{pdf_file.name}.json", doc_hash, cache_version, extracted
+                            )
+
+                    if is_assignment:
+                        # Use advanced extractor for assignments
+                        self._load_assignment_pdf(
+                            pdf_file, storage, category, extracted, doc_hash, pending_adds
+                        )
+                    else:
+                        # Use regular extractor for class materials
+                        self._load_material_pdf(
+                            pdf_file, storage, category, extracted, doc_hash, pending_adds
+                        )
+
+                except Exception as e:
+                    print(f"✗ ERROR")
+                    error_msg = f"{pdf_file.name}: {str(e)}"
+                    self.load_errors.append(error_msg)
+                    print(f"   Error details: {str(e)}")
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+    def _load_material_pdf(
+        self,
+        pdf_file: Path,
+        storage: Dict[str, str],
+        category: str,
+        content: Optional[str] = None,
+        doc_hash: Optional[str] = None,
+        pending_adds: Optional[Dict[str, list]] = None,
+    ):
+        """Load class material PDF with regular chunking, extracting its text unless given."""
         # Extract text from PDF
-        content = self.processor.extract_text(str(pdf_file))
+        if content is None:
+            content = self.processor.extract_text(str(pdf_file))
 
         if not content or len(content.strip()) < 10:
             print("⚠️  SKIPPED (no readable content)")
@@ -120,6 +292,7 @@ class KnowledgeBase:
 
         # Store content
         storage[pdf_file.name] = content
+        self._content_version += 1
 
         # If using vector store, chunk and add to ChromaDB
         if self.use_vector_store and self.vector_store:
@@ -141,19 +314,24 @@ class KnowledgeBase:
                 })
 
             # Add to vector store
-            self.vector_store.add_documents(
-                texts=chunks,
-                metadatas=chunk_metadatas,
-                ids=chunk_ids
-            )
+            self._add_chunks(pdf_file, chunks, chunk_metadatas, chunk_ids, doc_hash, pending_adds)
             print(f"✓ ({len(content)} chars, {len(chunks)} chunks)")
         else:
             print(f"✓ ({len(content)} chars)")
 
-    def _load_assignment_pdf(self, pdf_file: Path, storage: Dict[str, str], category: str):
-        """Load assignment PDF with advanced structured extraction."""
+    def _load_assignment_pdf(
+        self,
+        pdf_file: Path,
+        storage: Dict[str, str],
+        category: str,
+        structured_content: Optional[Dict] = None,
+        doc_hash: Optional[str] = None,
+        pending_adds: Optional[Dict[str, list]] = None,
+    ):
+        """Load assignment PDF with advanced structured extraction, unless already extracted."""
         # Extract structured content
-        structured_content = self.advanced_extractor.extract_structured_content(str(pdf_file))
+        if structured_content is None:
+            structured_content = self.advanced_extractor.extract_structured_content(str(pdf_file))
 
         # Store full text
         content = structured_content['full_text']
@@ -163,6 +341,7 @@ class KnowledgeBase:
             return
 
         storage[pdf_file.name] = content
+        self._content_version += 1
         self.assignment_structures[pdf_file.name] = structured_content
 
         # Extract images if any
@@ -201,11 +380,7 @@ class KnowledgeBase:
                 chunk_metadatas.append(metadata)
 
             # Add to vector store
-            self.vector_store.add_documents(
-                texts=chunk_texts,
-                metadatas=chunk_metadatas,
-                ids=chunk_ids
-            )
+            self._add_chunks(pdf_file, chunk_texts, chunk_metadatas, chunk_ids, doc_hash, pending_adds)
 
             # Print summary
             num_questions = len([c for c in chunks_data if c['metadata']['type'] == 'question'])
@@ -226,6 +401,154 @@ class KnowledgeBase:
         else:
             print(f"✓ ({len(content)} chars)")
 
+    def _add_chunks(
+        self,
+        pdf_file: Path,
+        texts: List[str],
+        metadatas: List[Dict],
+        ids: List[str],
+        doc_hash: Optional[str] = None,
+        pending_adds: Optional[Dict[str, list]] = None,
+    ):
+        """
+        Add a PDF's chunks to the vector store and the keyword index.
+
+        The vector store is persistent, so chunks are tagged with a hash of
+        the PDF's bytes and only re-embedded when the file has changed.
+
+        Args:
+            pdf_file: PDF the chunks were extracted from
+            texts: List of text chunks
+            metadatas: List of metadata dicts for each chunk
+            ids: List of unique IDs for each chunk
+            doc_hash: Hash of the PDF's bytes, if already computed
+            pending_adds: Buffer to defer the vector store add to, or None
+                to add the chunks now
+        """
+        if doc_hash is None:
+            doc_hash = self._file_hash(pdf_file)
+        for metadata in metadatas:
+            metadata["doc_hash"] = doc_hash
+
+        if not self.vector_store.has_document(pdf_file.name, doc_hash):
+            # Drop chunks from any previous version of this file first
+            self.vector_store.delete_by_source(pdf_file.name)
+            if pending_adds is not None:
+                pending_adds["texts"].extend(texts)
+                pending_adds["metadatas"].extend(metadatas)
+                pending_adds["ids"].extend(ids)
+                self._flush_vector_adds(pending_adds, full_batches_only=True)
+            else:
+                try:
+                    self.vector_store.add_documents(texts=texts, metadatas=metadatas, ids=ids)
+                except Exception:
+                    # Don't leave part of the PDF stored under its hash
+                    self.vector_store.delete_by_source(pdf_file.name)
+                    raise
+
+        # The keyword index is in memory and always rebuilt. Drop the
+        # file's previous chunks first: a new version may have fewer
+        self.keyword_index.delete_by_source(pdf_file.name)
+        self.keyword_index.add_documents(texts=texts, metadatas=metadatas, ids=ids)
+
+    @staticmethod
+    def _new_pending_adds() -> Dict[str, list]:
+        """Create an empty buffer of chunks waiting to be added to the vector store."""
+        return {"texts": [], "metadatas": [], "ids": []}
+
+    def _flush_vector_adds(self, pending_adds: Dict[str, list], full_batches_only: bool = False):
+        """
+        Add the buffered chunks to the vector store in one call.
+
+        Buffered chunks always hold whole PDFs. If any batch fails, the
+        chunks of every PDF in the buffer are deleted again so none is left
+        partially stored; they are re-embedded on the next load.
+
+        Args:
+            pending_adds: Buffer of chunks to add; emptied by this call
+            full_batches_only: Only add once at least ADD_BATCH_SIZE chunks
+                are buffered
+        """
+        if not pending_adds["ids"]:
+            return
+        if full_batches_only and len(pending_adds["ids"]) < self.ADD_BATCH_SIZE:
+            return
+
+        texts, pending_adds["texts"] = pending_adds["texts"], []
+        metadatas, pending_adds["metadatas"] = pending_adds["metadatas"], []
+        ids, pending_adds["ids"] = pending_adds["ids"], []
+
+        try:
+            self.vector_store.add_documents(texts=texts, metadatas=metadatas, ids=ids)
+        except Exception as e:
+            sources = sorted({metadata["source"] for metadata in metadatas})
+            for source in sources:
+                self.vector_store.delete_by_source(source)
+            self.load_errors.append(f"{', '.join(sources)}: {str(e)}")
+
+    @staticmethod
+    def _read_extract_cache(cache_file: Path, doc_hash: Optional[str], cache_version: str):
+        """
+        Read a PDF's cached extraction result.
+
+        Args:
+            cache_file: Cache file for the PDF
+            doc_hash: Hash of the PDF's current bytes
+            cache_version: Extraction version the entry must have been written with
+
+        Returns:
+            The cached text or structured content, or None if there is no
+            usable cache entry for this version of the PDF
+        """
+        if doc_hash is None:
+            return None
+        try:
+            entry = orjson.loads(cache_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if entry.get("doc_hash") != doc_hash or entry.get("version") != cache_version:
+            return None
+        return entry.get("extracted")
+
+    @staticmethod
+    def _write_extract_cache(cache_file: Path, doc_hash: str, cache_version: str, extracted) -> None:
+        """
+        Cache a PDF's extraction result, tagged with the hash of its bytes
+        and the extraction version.
+
+        Args:
+            cache_file: Cache file for the PDF
+            doc_hash: Hash of the PDF's bytes
+            cache_version: Version of the extraction code and options
+            extracted: Text or structured content extracted from the PDF
+        """
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_bytes(orjson.dumps(
+                {"doc_hash": doc_hash, "version": cache_version, "extracted": extracted}
+            ))
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError) as e:
+            print(f"⚠️  Could not cache extraction for {cache_file.stem}: {str(e)}", end=" ")
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """
+        Hash a file's contents.
+
+        Args:
+            path: File to hash
+
+        Returns:
+            Hex SHA-1 digest of the file's bytes
+        """
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
     def get_all_context(self) -> str:
         """
         Combine all materials and assignments into a single context string.
@@ -233,6 +556,11 @@ class KnowledgeBase:
         Returns:
             Formatted string with all PDF content
         """
+        cached = self._cached_context("all")
+        if cached is not None:
+            return cached
+
+        version = self._content_version
         context_parts = []
 
         if self.materials:
@@ -252,7 +580,7 @@ class KnowledgeBase:
         if not context_parts:
             return "No class materials or assignments have been loaded."
 
-        return "\n".join(context_parts)
+        return self._cache_context("all", version, "\n".join(context_parts))
 
     def get_materials_only(self) -> str:
         """
@@ -264,13 +592,18 @@ class KnowledgeBase:
         if not self.materials:
             return "No class materials loaded."
 
+        cached = self._cached_context("materials")
+        if cached is not None:
+            return cached
+
+        version = self._content_version
         parts = ["=== CLASS MATERIALS ===\n"]
         for filename, content in self.materials.items():
             parts.append(f"\n--- {filename} ---\n")
             parts.append(content)
             parts.append("\n")
 
-        return "\n".join(parts)
+        return self._cache_context("materials", version, "\n".join(parts))
 
     def get_assignments_only(self) -> str:
         """
@@ -282,13 +615,49 @@ class KnowledgeBase:
         if not self.assignments:
             return "No assignments loaded."
 
+        cached = self._cached_context("assignments")
+        if cached is not None:
+            return cached
+
+        version = self._content_version
         parts = ["=== ASSIGNMENTS ===\n"]
         for filename, content in self.assignments.items():
             parts.append(f"\n--- {filename} ---\n")
             parts.append(content)
             parts.append("\n")
 
-        return "\n".join(parts)
+        return self._cache_context("assignments", version, "\n".join(parts))
+
+    def _cached_context(self, kind: str) -> Optional[str]:
+        """
+        Get a joined context string if it was built from the current content.
+
+        Args:
+            kind: Which context ("all", "materials" or "assignments")
+
+        Returns:
+            The cached string, or None if missing or out of date
+        """
+        entry = self._context_cache.get(kind)
+        if entry is not None and entry[0] == self._content_version:
+            return entry[1]
+        return None
+
+    def _cache_context(self, kind: str, version: int, context: str) -> str:
+        """
+        Cache a joined context string.
+
+        Args:
+            kind: Which context ("all", "materials" or "assignments")
+            version: Content version read before the string was built, so a
+                string built while PDFs were still loading is never reused
+            context: The joined context string
+
+        Returns:
+            The context string
+        """
+        self._context_cache[kind] = (version, context)
+        return context
 
     def get_summary(self) -> dict:
         """
@@ -306,6 +675,39 @@ class KnowledgeBase:
             "errors": self.load_errors,
         }
 
+    def build_assignment_index(self) -> None:
+        """
+        Precompute the serialized assignment questions for sidebar display.
+
+        Stores the JSON bytes and an ETag for them in `assignment_index` so
+        the endpoint can serve the payload without rebuilding it per request.
+        """
+        questions_by_file = []
+
+        for filename, structured_content in self.assignment_structures.items():
+            questions = structured_content.get('questions', [])
+
+            if questions:
+                questions_by_file.append({
+                    "filename": filename,
+                    "questions": [
+                        {
+                            "id": q['id'],
+                            "text": q['text'],
+                            "has_scenario": q.get('has_scenario', False),
+                            "has_table": q.get('has_table', False),
+                            "has_image": q.get('has_image', False),
+                        }
+                        for q in questions
+                    ]
+                })
+
+        body = orjson.dumps({"assignments": questions_by_file})
+        # Weak ETag: the same JSON is also served gzip-encoded, and a strong
+        # validator would have to differ per encoding. Swap both values at
+        # once so readers never see a mismatched pair.
+        self.assignment_index = (body, f'W/"{hashlib.sha1(body).hexdigest()}"')
+
     def has_content(self) -> bool:
         """
         Check if any PDFs have been loaded.
@@ -335,14 +737,18 @@ class KnowledgeBase:
             return {"success": False, "error": "File must be a PDF"}
 
         try:
-            if pdf_type == 'assignment':
-                storage = self.assignments
-                category = "Assignments"
-                self._load_assignment_pdf(pdf_file, storage, category)
-            else:
-                storage = self.materials
-                category = "Class Materials"
-                self._load_material_pdf(pdf_file, storage, category)
+            # Chunks are added to the vector store directly (not buffered),
+            # so they are searchable once this returns
+            with self._write_lock:
+                if pdf_type == 'assignment':
+                    storage = self.assignments
+                    category = "Assignments"
+                    self._load_assignment_pdf(pdf_file, storage, category)
+                    self.build_assignment_index()
+                else:
+                    storage = self.materials
+                    category = "Class Materials"
+                    self._load_material_pdf(pdf_file, storage, category)
 
             return {
                 "success": True,
@@ -371,22 +777,119 @@ class KnowledgeBase:
             # Fallback to full context if vector store not enabled
             return self.get_all_context()
 
-        # Search for relevant chunks
-        results = self.vector_store.search(query, n_results=n_results)
+        # Hybrid search: dense vectors catch paraphrases, keywords catch exact
+        # identifiers like "question 5" that embeddings tend to miss
+        n_candidates = max(n_results, self.HYBRID_CANDIDATES)
+        dense_results = self.vector_store.search(query, n_results=n_candidates)
+        keyword_results = self.keyword_index.search(query, n_results=n_candidates)
+
+        return self._format_context(
+            self._select_results(query, dense_results, keyword_results, n_results)
+        )
+
+    def batch_get_relevant_context(self, queries: List[str], n_results: int = 5) -> List[str]:
+        """
+        Get relevant context for several queries with one batched vector search.
+
+        Args:
+            queries: User questions
+            n_results: Number of relevant chunks to retrieve per query
 
+        Returns:
+            Formatted context strings, one per query in input order
+        """
+        if not self.use_vector_store or not self.vector_store:
+            # Fallback to full context if vector store not enabled
+            return [self.get_all_context()] * len(queries)
+
+        n_candidates = max(n_results, self.HYBRID_CANDIDATES)
+        batch_results = self.vector_store.search_batch(queries, n_results=n_candidates)
+
+        contexts = []
+        for query, dense_results in zip(queries, batch_results):
+            keyword_results = self.keyword_index.search(query, n_results=n_candidates)
+            contexts.append(self._format_context(
+                self._select_results(query, dense_results, keyword_results, n_results)
+            ))
+        return contexts
+
+    def _select_results(
+        self,
+        query: str,
+        dense_results: List[Dict],
+        keyword_results: List[Dict],
+        n_results: int,
+    ) -> List[Dict]:
+        """
+        Pick the final chunks from the dense and keyword candidates.
+
+        Candidates are fused with RRF; if a reranker is configured, the fused
+        candidates are rescored by the cross-encoder and the best are kept.
+
+        Args:
+            query: User's question
+            dense_results: Vector search results, best first
+            keyword_results: Keyword search results, best first
+            n_results: Number of chunks to return
+
+        Returns:
+            Selected chunks, best first
+        """
+        if self.reranker is None:
+            return self._fuse_results([dense_results, keyword_results], n_results)
+
+        candidates = self._fuse_results(
+            [dense_results, keyword_results], max(n_results, self.HYBRID_CANDIDATES)
+        )
+        return self.reranker.rerank(query, candidates, n_results)
+
+    @staticmethod
+    def _fuse_results(ranked_lists: List[List[Dict]], n_results: int, k: int = 60) -> List[Dict]:
+        """
+        Combine ranked result lists with Reciprocal Rank Fusion.
+
+        Each chunk scores sum(1 / (k + rank)) over the lists it appears in,
+        so chunks ranked well by both searches rise to the top.
+
+        Args:
+            ranked_lists: Result lists, each ordered best first
+            n_results: Number of fused results to return
+            k: RRF damping constant
+
+        Returns:
+            Top fused results, best first
+        """
+        scores: Dict[str, float] = {}
+        chunks: Dict[str, Dict] = {}
+
+        for results in ranked_lists:
+            for rank, result in enumerate(results, 1):
+                chunk_id = result["id"]
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+                chunks.setdefault(chunk_id, result)
+
+        ranked_ids = sorted(scores, key=scores.get, reverse=True)
+        return [chunks[chunk_id] for chunk_id in ranked_ids[:n_results]]
+
+    def _format_context(self, results: List[Dict]) -> str:
+        """
+        Format search results with source attribution.
+
+        Args:
+            results: Search results from the vector store
+
+        Returns:
+            Formatted string with relevant context from PDFs
+        """
         if not results:
             return "No relevant information found in the class materials."
 
-        # Format results with source attribution
+        # Format results with source attribution, one string per match
         context_parts = [f"=== RELEVANT CONTEXT (Top {len(results)} matches) ===\n"]
-
-        for i, result in enumerate(results, 1):
-            metadata = result["metadata"]
-            text = result["text"]
-            source = metadata.get("source", "Unknown")
-            category = metadata.get("category", "Unknown")
-
-            context_parts.append(f"\n[Match {i}] From: {source} ({category})")
-            context_parts.append(f"{text}\n")
+        context_parts.extend(
+            f"\n[Match {i}] From: {result['metadata'].get('source', 'Unknown')} "
+            f"({result['metadata'].get('category', 'Unknown')})\n{result['text']}\n"
+            for i, result in enumerate(results, 1)
+        )
 
         return "\n".join(context_parts)
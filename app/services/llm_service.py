@@ -1,15 +1,33 @@
 """
 LLM service for Gemini API integration.
 """
+import google.api_core.exceptions as gae
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from google.generativeai import client as genai_client
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
+import random
+import threading
 import time
+from .ratelimit import TokenBucket
 from ..prompts.system_prompts import build_system_prompt, build_user_prompt
 
 
 class LLMService:
     """Handles interactions with the Gemini LLM API."""
 
+    # GenerativeModel objects kept for reuse, one per retrieved context
+    MODEL_CACHE_SIZE = 16
+
+    # Transient Gemini errors worth retrying with backoff
+    RETRYABLE_ERRORS = (
+        gae.ResourceExhausted,
+        gae.ServiceUnavailable,
+        gae.DeadlineExceeded,
+    )
+
     def __init__(
         self,
         api_key: str,
@@ -18,6 +36,9 @@ class LLMService:
         max_output_tokens: int = 1024,
         top_p: float = 0.9,
         top_k: int = 40,
+        requests_per_minute: int = 20,
+        burst: int = 5,
+        max_concurrency: int = 4,
     ):
         """
         Initialize LLM service with Gemini API.
@@ -29,13 +50,29 @@ class LLMService:
             max_output_tokens: Maximum tokens in response
             top_p: Nucleus sampling parameter
             top_k: Top-k sampling parameter
+            requests_per_minute: Sustained rate limit for Gemini calls
+            burst: Number of Gemini calls allowed back-to-back
+            max_concurrency: Maximum number of Gemini calls in flight at once
         """
         # Configure Gemini API
         genai.configure(api_key=api_key)
 
+        # Create the shared gRPC client up front. Every per-request
+        # GenerativeModel picks up this same client, so requests reuse one
+        # keep-alive channel instead of paying for a new TLS handshake.
+        self.client = genai_client.get_default_generative_client()
+        # Streaming uses the async client, which the SDK creates on first use
+        self._async_client_used = False
+
         # Store model name for later use
         self.model_name = model_name
 
+        # Models by retrieved context (LRU). Repeated questions retrieve the
+        # same context, so they can reuse an already-built model and skip
+        # rebuilding its system prompt.
+        self._models: "OrderedDict[str, genai.GenerativeModel]" = OrderedDict()
+        self._models_lock = threading.Lock()
+
         # Generation configuration
         self.generation_config = {
             "temperature": temperature,
@@ -44,6 +81,15 @@ class LLMService:
             "max_output_tokens": max_output_tokens,
         }
 
+        # Client-side rate limit so bursts queue instead of hitting 429s
+        self.rate_limiter = TokenBucket(rate_per_min=requests_per_minute, burst=burst)
+
+        # Cap on concurrent calls; the bucket bounds QPM, this bounds in-flight
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+
         # Safety settings
         self.safety_settings = [
             {
@@ -86,22 +132,14 @@ class LLMService:
             Hint-based response from the LLM
         """
         try:
-            # Create model with dynamic system instruction based on retrieved context
-            system_instruction = build_system_prompt(relevant_context)
-            model = genai.GenerativeModel(
-                model_name=self.model_name,
-                system_instruction=system_instruction,
+            model, user_prompt = self._prepare_request(
+                question, relevant_context, conversation_history
             )
 
-            # Format conversation history
-            history_text = self._format_history(conversation_history or [])
-
-            # Build user prompt with history
-            user_prompt = build_user_prompt(question, history_text)
-
             # Generate response with retry logic
             for attempt in range(max_retries):
                 try:
+                    self.rate_limiter.acquire()
                     response = model.generate_content(
                         user_prompt,
                         generation_config=self.generation_config,
@@ -117,29 +155,228 @@ class LLMService:
                             return "I'm unable to provide a hint for that question. Could you rephrase it or ask something related to the class materials?"
                         return "I couldn't generate a hint. Please try rephrasing your question."
 
-                except Exception as e:
+                except self.RETRYABLE_ERRORS as e:
+                    # Only transient errors are retried; anything else (bad
+                    # API key, invalid request) fails straight away
                     if attempt < max_retries - 1:
-                        # Wait before retrying
-                        wait_time = 2 ** attempt  # Exponential backoff
-                        print(f"Retry {attempt + 1}/{max_retries} after {wait_time}s: {str(e)}")
+                        # Wait before retrying (exponential backoff with jitter
+                        # so concurrent retries don't hit the API together)
+                        wait_time = 2 ** attempt + random.uniform(0, 0.5)
+                        print(f"Retry {attempt + 1}/{max_retries} after {wait_time:.1f}s: {str(e)}")
                         time.sleep(wait_time)
                         continue
                     else:
                         raise
 
         except Exception as e:
-            error_msg = str(e)
-            print(f"Error generating hint: {error_msg}")
-
-            # Provide user-friendly error messages
-            if "API_KEY" in error_msg.upper():
-                return "Configuration error: Please check that your Gemini API key is set correctly in the .env file."
-            elif "RATE_LIMIT" in error_msg.upper() or "429" in error_msg:
-                return "The service is experiencing high demand. Please wait a moment and try again."
-            elif "QUOTA" in error_msg.upper():
-                return "API quota exceeded. Please try again later."
-            else:
-                return f"I encountered an error while processing your question. Please try again. If the problem persists, check the server logs."
+            print(f"Error generating hint: {str(e)}")
+            return self._friendly_error(e)
+
+    async def generate_hint_async(
+        self,
+        question: str,
+        relevant_context: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+    ) -> str:
+        """
+        Generate a hint without blocking the event loop.
+
+        Waits for a concurrency slot, then runs generate_hint in a worker thread.
+
+        Args:
+            question: Student's question
+            relevant_context: Relevant context retrieved from vector store
+            conversation_history: Previous conversation messages
+
+        Returns:
+            Hint-based response from the LLM
+        """
+        async with self._concurrency_slot():
+            return await asyncio.to_thread(
+                self.generate_hint,
+                question=question,
+                relevant_context=relevant_context,
+                conversation_history=conversation_history,
+            )
+
+    async def generate_hint_stream(
+        self,
+        question: str,
+        relevant_context: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        max_retries: int = 3,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a hint-based response, yielding text as Gemini produces it.
+
+        Transient errors are retried while no text has been yielded yet.
+        Errors before the first piece of text are yielded as a friendly
+        message, like generate_hint; an error after that is raised, so the
+        caller can tell the reply is incomplete.
+
+        Args:
+            question: Student's question
+            relevant_context: Relevant context retrieved from vector store
+            conversation_history: Previous conversation messages
+            max_retries: Maximum number of attempts before any text is yielded
+
+        Yields:
+            Pieces of the hint-based response, in order
+        """
+        yielded_text = False
+        try:
+            model, user_prompt = self._prepare_request(
+                question, relevant_context, conversation_history
+            )
+
+            async with self._concurrency_slot():
+                for attempt in range(max_retries):
+                    try:
+                        await self.rate_limiter.acquire_async()
+                        self._async_client_used = True
+                        response = await model.generate_content_async(
+                            user_prompt,
+                            generation_config=self.generation_config,
+                            safety_settings=self.safety_settings,
+                            stream=True,
+                        )
+
+                        async for chunk in response:
+                            try:
+                                text = chunk.text
+                            except ValueError:
+                                # Chunk has no text parts (e.g. blocked by safety filters)
+                                continue
+                            if text:
+                                yielded_text = True
+                                yield text
+                        break
+
+                    except self.RETRYABLE_ERRORS as e:
+                        # A retry after text was sent would repeat it, so only
+                        # retry failures that happen before the first piece
+                        if yielded_text or attempt == max_retries - 1:
+                            raise
+                        wait_time = 2 ** attempt + random.uniform(0, 0.5)
+                        print(f"Retry {attempt + 1}/{max_retries} after {wait_time:.1f}s: {str(e)}")
+                        await asyncio.sleep(wait_time)
+
+            if not yielded_text:
+                yield "I'm unable to provide a hint for that question. Could you rephrase it or ask something related to the class materials?"
+
+        except Exception as e:
+            print(f"Error streaming hint: {str(e)}")
+            if yielded_text:
+                raise
+            yield self._friendly_error(e)
+
+    @asynccontextmanager
+    async def _concurrency_slot(self):
+        """Hold one of the max_concurrency slots for a Gemini call."""
+        self._queued += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self.semaphore.release()
+
+    def get_stats(self) -> Dict:
+        """
+        Get Gemini call concurrency statistics.
+
+        Returns:
+            Dictionary with the concurrency limit, in-flight and queued calls
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+        }
+
+    def _prepare_request(
+        self,
+        question: str,
+        relevant_context: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+    ) -> Tuple[genai.GenerativeModel, str]:
+        """
+        Build the model and user prompt for a hint request.
+
+        Args:
+            question: Student's question
+            relevant_context: Relevant context retrieved from vector store
+            conversation_history: Previous conversation messages
+
+        Returns:
+            Tuple of (model configured with the system prompt, user prompt)
+        """
+        # Get model with dynamic system instruction based on retrieved context
+        model = self._get_model(relevant_context)
+
+        # Format conversation history
+        history_text = self._format_history(conversation_history or [])
+
+        # Build user prompt with history
+        user_prompt = build_user_prompt(question, history_text)
+
+        return model, user_prompt
+
+    def _get_model(self, relevant_context: str) -> genai.GenerativeModel:
+        """
+        Get a model for retrieved context, reusing a cached one if possible.
+
+        The system prompt is only built when no model is cached for the
+        context, since it is fully determined by the context.
+
+        Args:
+            relevant_context: Relevant context retrieved from vector store
+
+        Returns:
+            GenerativeModel with the system prompt for this context
+        """
+        with self._models_lock:
+            model = self._models.get(relevant_context)
+            if model is not None:
+                self._models.move_to_end(relevant_context)
+                return model
+
+        model = genai.GenerativeModel(
+            model_name=self.model_name,
+            system_instruction=build_system_prompt(relevant_context),
+        )
+
+        with self._models_lock:
+            self._models[relevant_context] = model
+            while len(self._models) > self.MODEL_CACHE_SIZE:
+                self._models.popitem(last=False)
+        return model
+
+    def _friendly_error(self, error: Exception) -> str:
+        """
+        Convert an API error into a user-friendly message.
+
+        Args:
+            error: Exception raised while calling Gemini
+
+        Returns:
+            Message suitable for showing to the student
+        """
+        error_msg = str(error)
+
+        if "API_KEY" in error_msg.upper():
+            return "Configuration error: Please check that your Gemini API key is set correctly in the .env file."
+        elif "RATE_LIMIT" in error_msg.upper() or "429" in error_msg:
+            return "The service is experiencing high demand. Please wait a moment and try again."
+        elif "QUOTA" in error_msg.upper():
+            return "API quota exceeded. Please try again later."
+        else:
+            return f"I encountered an error while processing your question. Please try again. If the problem persists, check the server logs."
 
     def _format_history(self, history: List[Dict[str, str]]) -> str:
         """
@@ -162,6 +399,22 @@ class LLMService:
 
         return "\n".join(formatted)
 
+    async def close(self) -> None:
+        """Close the shared Gemini connections used by the sync and async clients."""
+        try:
+            self.client.transport.close()
+        except Exception as e:
+            print(f"Error closing Gemini client: {str(e)}")
+
+        # Streaming goes through the async client, which has its own channel.
+        # Looking it up would create it, so skip it if nothing streamed.
+        if not self._async_client_used:
+            return
+        try:
+            await genai_client.get_default_generative_async_client().transport.close()
+        except Exception as e:
+            print(f"Error closing Gemini async client: {str(e)}")
+
     def test_connection(self) -> bool:
         """
         Test the connection to Gemini API.
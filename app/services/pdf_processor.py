@@ -7,6 +7,15 @@ from typing import List
 from pathlib import Path
 
 
+# Compiled once and shared by every processor
+_WHITESPACE_RE = re.compile(r'\s+')
+# Anything other than letters, numbers, whitespace and basic punctuation.
+# This also covers every control character that isn't whitespace.
+_DISALLOWED_CHARS_RE = re.compile(r'[^\w\s\.\,\?\!\-\:\;\(\)\[\]\{\}\"\'\n\r]')
+# Whitespace following a sentence-ending punctuation mark
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+
 class PDFProcessor:
     """Handles PDF text extraction and processing."""
 
@@ -35,19 +44,21 @@ class PDFProcessor:
             Exception: If PDF processing fails
         """
         try:
-            text = ""
+            page_texts = []
             doc = fitz.open(pdf_path)
 
             for page_num, page in enumerate(doc):
                 try:
-                    page_text = page.get_text()
-                    text += page_text
+                    page_texts.append(page.get_text())
                 except Exception as e:
                     print(f"Warning: Error extracting text from page {page_num + 1}: {str(e)}")
                     continue
 
             doc.close()
 
+            # Join once rather than growing a string page by page
+            text = "".join(page_texts)
+
             # Clean the extracted text
             cleaned_text = self.clean_text(text)
 
@@ -70,14 +81,11 @@ class PDFProcessor:
             return ""
 
         # Replace multiple whitespace with single space
-        text = re.sub(r'\s+', ' ', text)
-
-        # Remove control characters but keep basic punctuation
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+        text = _WHITESPACE_RE.sub(' ', text)
 
-        # Remove excessive special characters while keeping basic ones
-        # Keep: letters, numbers, spaces, and basic punctuation
-        text = re.sub(r'[^\w\s\.\,\?\!\-\:\;\(\)\[\]\{\}\"\'\n\r]', '', text)
+        # Remove control characters and excessive special characters in one
+        # pass. Keep: letters, numbers, spaces, and basic punctuation
+        text = _DISALLOWED_CHARS_RE.sub('', text)
 
         # Strip leading/trailing whitespace
         text = text.strip()
@@ -143,7 +151,7 @@ class PDFProcessor:
             List of text chunks
         """
         # Simple sentence splitting (can be improved with nltk)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
 
         chunks = []
         current_chunk = []
@@ -173,11 +181,11 @@ class PDFProcessor:
             True if valid PDF, False otherwise
         """
         try:
-            doc = fitz.open(pdf_path)
-            page_count = doc.page_count
-            doc.close()
-            return page_count > 0
-        except:
+            with fitz.open(pdf_path) as doc:
+                return doc.page_count > 0
+        except (RuntimeError, OSError):
+            # PyMuPDF's open errors (FileDataError, FileNotFoundError, ...)
+            # are RuntimeErrors
             return False
 
     def get_pdf_info(self, pdf_path: str) -> dict:
@@ -191,14 +199,12 @@ class PDFProcessor:
             Dictionary with PDF metadata
         """
         try:
-            doc = fitz.open(pdf_path)
-            metadata = {
-                'page_count': doc.page_count,
-                'title': doc.metadata.get('title', 'Unknown'),
-                'author': doc.metadata.get('author', 'Unknown'),
-                'subject': doc.metadata.get('subject', 'Unknown'),
-            }
-            doc.close()
-            return metadata
+            with fitz.open(pdf_path) as doc:
+                return {
+                    'page_count': doc.page_count,
+                    'title': doc.metadata.get('title', 'Unknown'),
+                    'author': doc.metadata.get('author', 'Unknown'),
+                    'subject': doc.metadata.get('subject', 'Unknown'),
+                }
         except Exception as e:
             return {'error': str(e)}
@@ -0,0 +1,86 @@
+"""
+Token-bucket rate limiting for outbound Gemini API calls.
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from both sync and async code.
+
+    Tokens refill continuously at `rate_per_min / 60` per second up to
+    `burst`. Each call takes one token, waiting for a refill when empty.
+    """
+
+    def __init__(self, rate_per_min: float, burst: int = 1):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate_per_min: Sustained number of calls allowed per minute
+            burst: Maximum number of calls allowed back-to-back
+
+        Raises:
+            ValueError: If rate_per_min is not positive or burst is below 1
+        """
+        if rate_per_min <= 0:
+            raise ValueError(f"rate_per_min must be greater than 0, got {rate_per_min}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+
+        self.rate = rate_per_min / 60.0
+        self.capacity = burst
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        while True:
+            wait = self._try_take()
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a token is available."""
+        while True:
+            wait = self._try_take()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
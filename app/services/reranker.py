@@ -0,0 +1,72 @@
+"""
+Cross-encoder reranking of retrieved chunks.
+"""
+from typing import Dict, List
+import threading
+
+
+class Reranker:
+    """Reorders retrieval candidates by cross-encoder relevance to the query."""
+
+    def __init__(self, model_name: str = "BAAI/bge-reranker-base"):
+        """
+        Initialize reranker.
+
+        The model is loaded by load(), or lazily on first use.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model to use
+        """
+        self.model_name = model_name
+        self._model = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        """Load the cross-encoder once; returns None if it can't be loaded."""
+        if self._model is None and not self._failed:
+            with self._lock:
+                if self._model is None and not self._failed:
+                    try:
+                        from sentence_transformers import CrossEncoder
+
+                        self._model = CrossEncoder(self.model_name)
+                        print(f"✓ Reranker loaded ({self.model_name})")
+                    except Exception as e:
+                        # Retrieval still works without reranking
+                        self._failed = True
+                        print(f"⚠️  Reranker unavailable, using fused ranking: {str(e)}")
+        return self._model
+
+    def load(self) -> bool:
+        """
+        Load the cross-encoder now instead of on the first query.
+
+        The first load may download the model, so call this from a
+        background task rather than a request path.
+
+        Returns:
+            True if the model is available
+        """
+        return self._get_model() is not None
+
+    def rerank(self, query: str, candidates: List[Dict], n_results: int) -> List[Dict]:
+        """
+        Keep the candidates most relevant to the query.
+
+        Args:
+            query: User's question
+            candidates: Retrieved chunks with a "text" key
+            n_results: Number of chunks to keep
+
+        Returns:
+            Top chunks by cross-encoder score, or the first n_results
+            candidates unchanged if the model is unavailable
+        """
+        model = self._get_model()
+        if model is None or len(candidates) <= 1:
+            return candidates[:n_results]
+
+        scores = model.predict([(query, candidate["text"]) for candidate in candidates])
+        ranked = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+        return [candidates[i] for i in ranked[:n_results]]
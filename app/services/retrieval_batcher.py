@@ -0,0 +1,98 @@
+"""
+Micro-batching of concurrent retrieval requests into single vector searches.
+"""
+import asyncio
+from typing import Optional, Tuple
+from .knowledge_base import KnowledgeBase
+
+
+class RetrievalBatcher:
+    """Coalesces retrievals that arrive close together into one batched query."""
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        n_results: int = 5,
+        max_batch_size: int = 16,
+        max_wait_ms: int = 10,
+    ):
+        """
+        Initialize retrieval batcher.
+
+        Args:
+            knowledge_base: Knowledge base used to run the batched searches
+            n_results: Number of relevant chunks to retrieve per query
+            max_batch_size: Maximum number of queries sent in one batch
+            max_wait_ms: Milliseconds to wait for more queries before flushing
+        """
+        self.knowledge_base = knowledge_base
+        self.n_results = n_results
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        print(f"✓ Retrieval Batcher initialized (max batch: {max_batch_size}, wait: {max_wait_ms}ms)")
+
+    def start(self) -> None:
+        """Start the background coroutine that drains the queue."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background coroutine."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def get_relevant_context(self, query: str) -> str:
+        """
+        Queue a query and wait for its batched result.
+
+        Args:
+            query: User's question
+
+        Returns:
+            Formatted string with relevant context from PDFs
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect queued queries into batches and resolve their futures."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Gather more queries until the batch is full or the window closes
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            queries = [query for query, _ in batch]
+            try:
+                contexts = await asyncio.to_thread(
+                    self.knowledge_base.batch_get_relevant_context,
+                    queries,
+                    self.n_results,
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), context in zip(batch, contexts):
+                if not future.done():
+                    future.set_result(context)
@@ -0,0 +1,118 @@
+"""
+In-memory LRU + TTL cache for semantic search results.
+"""
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """Caches retrieved context keyed by the normalized query text."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: int = 300):
+        """
+        Initialize retrieval cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl_seconds: Seconds before a cached entry is considered stale
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        logger.info("✓ Retrieval Cache initialized (max size: %d, ttl: %ds)", max_size, ttl_seconds)
+
+    @staticmethod
+    def make_key(query: str, n_results: int) -> str:
+        """
+        Build a cache key from a query.
+
+        Queries are lowercased and whitespace-collapsed so trivially different
+        phrasings of the same question share an entry.
+
+        Args:
+            query: User's question
+            n_results: Number of chunks requested
+
+        Returns:
+            Hex digest identifying the normalized query
+        """
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha1(f"{n_results}:{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str, n_results: int) -> Optional[str]:
+        """
+        Look up cached context for a query.
+
+        Args:
+            query: User's question
+            n_results: Number of chunks requested
+
+        Returns:
+            Cached context string, or None on a miss or expired entry
+        """
+        key = self.make_key(query, n_results)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, context = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return context
+
+    def set(self, query: str, n_results: int, context: str) -> None:
+        """
+        Store retrieved context for a query.
+
+        Args:
+            query: User's question
+            n_results: Number of chunks requested
+            context: Formatted context returned by the knowledge base
+        """
+        key = self.make_key(query, n_results)
+        self._entries[key] = (time.monotonic(), context)
+        self._entries.move_to_end(key)
+
+        # Evict least recently used entries beyond the size limit
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> int:
+        """
+        Remove all cached entries.
+
+        Returns:
+            Number of entries removed
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def get_stats(self) -> dict:
+        """
+        Get statistics about the cache.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
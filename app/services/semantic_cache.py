@@ -0,0 +1,181 @@
+"""
+In-memory LRU cache of vector search results matched by query similarity.
+"""
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import re
+import threading
+
+import numpy as np
+
+# Tokens containing a digit, e.g. "3", "2a" or "q4"
+_IDENTIFIER_RE = re.compile(r"\w*\d\w*")
+# Letter or Roman-numeral markers after an item word, e.g. "part a",
+# "question (b)" or "section iv"
+_ITEM_MARKER_RE = re.compile(
+    r"\b(part|question|q|section|exercise|problem|item|task)\s+\(?([a-z]|[ivx]+)\b\)?"
+)
+
+
+class SemanticCache:
+    """Caches vector search results keyed by the query's embedding."""
+
+    def __init__(self, max_size: int = 512, threshold: float = 0.97):
+        """
+        Initialize semantic cache.
+
+        A lookup hits when a cached query's embedding has at least
+        `threshold` cosine similarity with the new query's embedding, so
+        near-duplicate phrasings reuse one vector search. Queries that
+        mention different numbers or identifiers ("question 3" vs
+        "question 4") never share an entry, however similar they embed.
+
+        Args:
+            max_size: Maximum number of cached queries
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        # Cached embeddings are rows of one (max_size, dim) matrix, so a
+        # lookup is a single matrix-vector product. Entries map a row to
+        # (n_results, filter key, identifier tokens, results) in
+        # least-recently-used order.
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_size, dtype=bool)
+        self._entries: "OrderedDict[int, Tuple[int, str, FrozenSet[str], List[Dict]]]" = OrderedDict()
+        self._free_rows = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+        # Bumped by clear(), so results fetched before the collection
+        # changed are not cached afterwards
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _identifiers(query: str) -> FrozenSet[str]:
+        """Get the lowercased identifiers (numbers and item markers) a query names."""
+        query = query.lower()
+        identifiers = set(_IDENTIFIER_RE.findall(query))
+        identifiers.update(f"{word} {marker}" for word, marker in _ITEM_MARKER_RE.findall(query))
+        return frozenset(identifiers)
+
+    def get(
+        self,
+        embedding,
+        n_results: int,
+        filter_key: str = "",
+        query: str = "",
+    ) -> Optional[List[Dict]]:
+        """
+        Look up cached results for a query embedding.
+
+        Args:
+            embedding: Query embedding
+            n_results: Number of results requested
+            filter_key: Serialized metadata filter the search used
+            query: Query text, whose identifier tokens must match the cached query's
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            sims = self._matrix @ self._normalize(embedding)
+            sims[~self._valid] = -1.0
+            rows = np.flatnonzero(sims >= self.threshold)
+
+            # Best match first; it must have used the same filter, mention
+            # the same identifiers and have fetched at least as many results
+            identifiers = self._identifiers(query)
+            for row in rows[np.argsort(-sims[rows])].tolist():
+                cached_n, cached_filter, cached_identifiers, results = self._entries[row]
+                if (
+                    cached_filter == filter_key
+                    and cached_identifiers == identifiers
+                    and cached_n >= n_results
+                ):
+                    self._entries.move_to_end(row)
+                    self.hits += 1
+                    return results[:n_results]
+
+            self.misses += 1
+            return None
+
+    def set(
+        self,
+        embedding,
+        n_results: int,
+        results: List[Dict],
+        filter_key: str = "",
+        generation: Optional[int] = None,
+        query: str = "",
+    ) -> None:
+        """
+        Store search results for a query embedding.
+
+        Args:
+            embedding: Query embedding
+            n_results: Number of results requested
+            results: Search results
+            filter_key: Serialized metadata filter the search used
+            generation: Value of `generation` read before searching; the
+                results are dropped if the cache was cleared since
+            query: Query text the results were fetched for
+        """
+        if self.max_size <= 0:
+            return
+
+        vector = self._normalize(embedding)
+        identifiers = self._identifiers(query)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._clear_entries()
+
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row, _ = self._entries.popitem(last=False)
+
+            self._matrix[row] = vector
+            self._valid[row] = True
+            self._entries[row] = (n_results, filter_key, identifiers, results)
+
+    def clear(self) -> None:
+        """Drop all cached results, e.g. after the collection changes."""
+        with self._lock:
+            self.generation += 1
+            self._clear_entries()
+
+    def _clear_entries(self) -> None:
+        """Drop all entries; the caller must hold the lock."""
+        self._entries.clear()
+        self._valid[:] = False
+        self._free_rows = list(range(self.max_size - 1, -1, -1))
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, limits and hit/miss counts
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
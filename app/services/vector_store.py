@@ -3,21 +3,59 @@ Vector store service using ChromaDB for semantic search.
 """
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from itertools import repeat
 from typing import List, Dict, Optional
 from pathlib import Path
+import json
+import logging
+
+from .embeddings import CudaMiniLM, QuantizedMiniLM
+from .semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
 
 
 class VectorStore:
     """Manages vector embeddings and semantic search using ChromaDB."""
 
-    def __init__(self, persist_directory: str = "data/chromadb"):
+    def __init__(
+        self,
+        persist_directory: str = "data/chromadb",
+        quantize_embeddings: bool = True,
+        add_batch_size: int = 200,
+        embedding_device: str = "cpu",
+        hnsw_m: int = 24,
+        hnsw_construction_ef: int = 128,
+        hnsw_search_ef: int = 64,
+        query_cache_size: int = 512,
+        query_cache_threshold: float = 0.97,
+    ):
         """
         Initialize ChromaDB vector store.
 
+        HNSW tradeoffs: a larger M (links per node) and construction_ef
+        build a better-connected graph, improving recall at the cost of
+        slower inserts and more memory. A larger search_ef raises recall
+        at the cost of query latency and must be at least n_results. M and
+        construction_ef only apply when the collection is created;
+        search_ef is also updated on an existing collection.
+
         Args:
             persist_directory: Directory to persist ChromaDB data
+            quantize_embeddings: Embed with the int8-quantized model instead of FP32
+            add_batch_size: Maximum chunks sent to ChromaDB per add() call
+            embedding_device: "cuda" to embed on a GPU when one is available,
+                otherwise "cpu"
+            hnsw_m: Maximum neighbors per node in the HNSW graph
+            hnsw_construction_ef: Candidate list size while building the graph
+            hnsw_search_ef: Candidate list size while searching
+            query_cache_size: Searches kept in the semantic query cache (0 = off)
+            query_cache_threshold: Cosine similarity at which a cached search
+                is reused for a new query
         """
         self.persist_directory = Path(persist_directory)
+        self.add_batch_size = add_batch_size
         self.persist_directory.mkdir(parents=True, exist_ok=True)
 
         # Initialize ChromaDB client with persistence
@@ -30,15 +68,49 @@ class VectorStore:
         )
 
         # Create or get collection
-        # Using default embedding function (all-MiniLM-L6-v2)
+        # Using default embedding model (all-MiniLM-L6-v2), on the GPU if
+        # requested and available, otherwise optionally int8-quantized
+        use_cuda = embedding_device == "cuda"
+        if use_cuda and not CudaMiniLM.is_available():
+            logger.warning("⚠️  CUDA not available to ONNX Runtime, embedding on CPU")
+            use_cuda = False
+        if use_cuda:
+            self.embedding_function = CudaMiniLM()
+        elif quantize_embeddings:
+            self.embedding_function = QuantizedMiniLM()
+        else:
+            self.embedding_function = DefaultEmbeddingFunction()
+        self._collection_kwargs = {"embedding_function": self.embedding_function}
+        self._collection_metadata = {
+            "hnsw:space": "cosine",
+            "hnsw:M": hnsw_m,
+            "hnsw:construction_ef": hnsw_construction_ef,
+            "hnsw:search_ef": hnsw_search_ef,
+        }
         self.collection = self.client.get_or_create_collection(
             name="pdf_knowledge_base",
-            metadata={"hnsw:space": "cosine"}
+            metadata=self._collection_metadata,
+            **self._collection_kwargs,
         )
 
-        print(f"✓ Vector Store initialized (ChromaDB)")
-        print(f"  Collection: pdf_knowledge_base")
-        print(f"  Documents in collection: {self.collection.count()}")
+        # An existing collection keeps its stored HNSW parameters, but
+        # search_ef can still be changed
+        try:
+            hnsw_config = (self.collection.configuration_json or {}).get("hnsw") or {}
+            if hnsw_config.get("ef_search", hnsw_search_ef) != hnsw_search_ef:
+                self.collection.modify(configuration={"hnsw": {"ef_search": hnsw_search_ef}})
+        except Exception as e:
+            logger.warning("⚠️  Could not update HNSW search_ef: %s", e)
+
+        # Queries are embedded before searching, so near-duplicates of
+        # recent queries can reuse their results without an HNSW search
+        self.query_cache = SemanticCache(
+            max_size=query_cache_size, threshold=query_cache_threshold
+        ) if query_cache_size > 0 else None
+
+        logger.info("✓ Vector Store initialized (ChromaDB)")
+        logger.info("  Collection: pdf_knowledge_base")
+        logger.info("  Documents in collection: %d", self.collection.count())
 
     def add_documents(
         self,
@@ -49,26 +121,61 @@ class VectorStore:
         """
         Add documents to the vector store.
 
+        Documents are sent to ChromaDB in batches of at most add_batch_size.
+        A failing batch doesn't stop the rest from being added; the first
+        error is raised once every batch has been tried. IDs already in the
+        collection are skipped, as ChromaDB would, but without embedding
+        their text first.
+
         Args:
             texts: List of text chunks to embed
             metadatas: List of metadata dicts for each chunk
             ids: List of unique IDs for each chunk
+
+        Raises:
+            Exception: The first error raised by a failing batch
         """
         if not texts:
-            print("⚠️  No documents to add to vector store")
+            logger.warning("⚠️  No documents to add to vector store")
             return
 
-        try:
-            # Add documents to ChromaDB (embeddings generated automatically)
-            self.collection.add(
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"✓ Added {len(texts)} document chunks to vector store")
-        except Exception as e:
-            print(f"✗ Error adding documents to vector store: {str(e)}")
-            raise
+        batch_size = self.add_batch_size
+        added = 0
+        first_error: Optional[Exception] = None
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            batch_texts = texts[start:end]
+            batch_metadatas = metadatas[start:end]
+            batch_ids = ids[start:end]
+            try:
+                # ChromaDB ignores IDs it already has, but only after
+                # embedding them, so drop those up front
+                existing = set(self.collection.get(ids=batch_ids, include=[])["ids"])
+                if existing:
+                    keep = [i for i, chunk_id in enumerate(batch_ids) if chunk_id not in existing]
+                    batch_texts = [batch_texts[i] for i in keep]
+                    batch_metadatas = [batch_metadatas[i] for i in keep]
+                    batch_ids = [batch_ids[i] for i in keep]
+                    if not batch_ids:
+                        continue
+
+                # Add documents to ChromaDB (embeddings generated automatically)
+                self.collection.add(
+                    documents=batch_texts,
+                    metadatas=batch_metadatas,
+                    ids=batch_ids
+                )
+                added += len(batch_ids)
+            except Exception as e:
+                logger.error("✗ Error adding documents to vector store: %s", e)
+                if first_error is None:
+                    first_error = e
+
+        if added:
+            self._clear_query_cache()
+            logger.debug("✓ Added %d document chunks to vector store", added)
+        if first_error is not None:
+            raise first_error
 
     def search(
         self,
@@ -87,28 +194,87 @@ class VectorStore:
         Returns:
             List of relevant document chunks with metadata
         """
+        return self.search_batch([query], n_results, filter_metadata)[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries in a single ChromaDB call.
+
+        Embedding and HNSW lookups for all queries are done in one batch,
+        which is cheaper than issuing one query per request. Queries close
+        enough to a recently searched one are answered from the query cache.
+
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            filter_metadata: Optional metadata filter
+
+        Returns:
+            One list of relevant document chunks per query, in input order
+        """
+        if not queries:
+            return []
+
         try:
+            # Embed here rather than inside query() so the embeddings can
+            # also be matched against the query cache
+            embeddings = self.embedding_function(queries)
+
+            filter_key = json.dumps(filter_metadata, sort_keys=True) if filter_metadata else ""
+            cache = self.query_cache
+            generation = cache.generation if cache else None
+            batch_results: List[Optional[List[Dict]]] = [
+                cache.get(embedding, n_results, filter_key, query=query) if cache else None
+                for embedding, query in zip(embeddings, queries)
+            ]
+            misses = [q for q, cached in enumerate(batch_results) if cached is None]
+            if not misses:
+                return batch_results
+
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=[embeddings[q] for q in misses],
                 n_results=n_results,
                 where=filter_metadata if filter_metadata else None,
             )
 
-            # Format results
-            formatted_results = []
-            if results["documents"] and results["documents"][0]:
-                for i in range(len(results["documents"][0])):
-                    formatted_results.append({
-                        "text": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i],
-                        "distance": results["distances"][0][i] if "distances" in results else None,
-                    })
+            # Bind the result columns once; each result is then built by
+            # zipping one query's row of every column
+            ids = results["ids"]
+            documents = results["documents"]
+            metadatas = results["metadatas"]
+            distances = results.get("distances")
+            for m, q in enumerate(misses):
+                formatted_results = [
+                    {"id": chunk_id, "text": text, "metadata": metadata, "distance": distance}
+                    for chunk_id, text, metadata, distance in zip(
+                        ids[m],
+                        documents[m] if documents else [],
+                        metadatas[m],
+                        distances[m] if distances else repeat(None),
+                    )
+                ]
+                batch_results[q] = formatted_results
+                if cache:
+                    cache.set(
+                        embeddings[q], n_results, formatted_results, filter_key, generation,
+                        query=queries[q],
+                    )
 
-            return formatted_results
+            return batch_results
 
         except Exception as e:
-            print(f"Error searching vector store: {str(e)}")
-            return []
+            logger.error("Error searching vector store: %s", e)
+            return [[] for _ in queries]
+
+    def _clear_query_cache(self) -> None:
+        """Drop cached searches after the collection has changed."""
+        if self.query_cache:
+            self.query_cache.clear()
 
     def clear(self) -> None:
         """Clear all documents from the collection."""
@@ -117,11 +283,20 @@ class VectorStore:
             self.client.delete_collection(name="pdf_knowledge_base")
             self.collection = self.client.get_or_create_collection(
                 name="pdf_knowledge_base",
-                metadata={"hnsw:space": "cosine"}
+                metadata=self._collection_metadata,
+                **self._collection_kwargs,
             )
-            print("✓ Vector store cleared")
+            self._clear_query_cache()
+            logger.info("✓ Vector store cleared")
+        except Exception as e:
+            logger.error("Error clearing vector store: %s", e)
+
+    def close(self) -> None:
+        """Release the ChromaDB client, flushing and stopping its system."""
+        try:
+            self.client.close()
         except Exception as e:
-            print(f"Error clearing vector store: {str(e)}")
+            logger.error("Error closing vector store: %s", e)
 
     def get_stats(self) -> Dict:
         """
@@ -133,8 +308,31 @@ class VectorStore:
         return {
             "total_documents": self.collection.count(),
             "collection_name": self.collection.name,
+            "query_cache": self.query_cache.get_stats() if self.query_cache else None,
         }
 
+    def has_document(self, source: str, doc_hash: str) -> bool:
+        """
+        Check whether a source's chunks are stored for a given version.
+
+        Args:
+            source: Source filename
+            doc_hash: Hash of the source file's contents
+
+        Returns:
+            True if chunks with this source and hash are already stored
+        """
+        try:
+            results = self.collection.get(
+                where={"$and": [{"source": source}, {"doc_hash": doc_hash}]},
+                limit=1,
+                include=[],
+            )
+            return bool(results["ids"])
+        except Exception as e:
+            logger.error("Error checking vector store: %s", e)
+            return False
+
     def delete_by_source(self, source: str) -> None:
         """
         Delete all documents from a specific source.
@@ -143,13 +341,18 @@ class VectorStore:
             source: Source filename to delete
         """
         try:
-            # Get all IDs for this source
-            results = self.collection.get(
-                where={"source": source}
-            )
+            # Delete by predicate so the IDs (and their documents) are never
+            # fetched; the count is only used for logging
+            count_before = self.collection.count()
+            self.collection.delete(where={"source": source})
+            deleted = count_before - self.collection.count()
 
-            if results["ids"]:
-                self.collection.delete(ids=results["ids"])
-                print(f"✓ Deleted {len(results['ids'])} chunks from source: {source}")
+            if deleted > 0:
+                logger.debug("✓ Deleted %d chunks from source: %s", deleted, source)
         except Exception as e:
-            print(f"Error deleting from vector store: {str(e)}")
+            logger.error("Error deleting from vector store: %s", e)
+        finally:
+            # Concurrent adds can make the count difference wrong, and a
+            # failed delete may have removed some chunks, so always drop
+            # cached results
+            self._clear_query_cache()
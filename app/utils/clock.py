@@ -0,0 +1,32 @@
+"""
+Cheap ISO 8601 timestamps for hot request paths.
+"""
+from datetime import datetime
+import threading
+import time
+
+
+_local = threading.local()
+
+
+def iso_now() -> str:
+    """
+    Get the current local time as an ISO 8601 string with millisecond precision.
+
+    The formatted string is cached per thread and only rebuilt when the
+    millisecond changes, so several timestamps taken while handling one
+    request share a single datetime/isoformat call.
+
+    Returns:
+        ISO 8601 timestamp, e.g. "2024-01-15T10:30:00.123"
+    """
+    now_ms = time.time_ns() // 1_000_000
+
+    if getattr(_local, "last_ms", None) != now_ms:
+        seconds, millis = divmod(now_ms, 1000)
+        stamp = datetime.fromtimestamp(seconds).replace(microsecond=millis * 1000)
+        _local.last_ms = now_ms
+        # Fixed width: plain isoformat() drops the fraction when it is zero
+        _local.last_str = stamp.isoformat(timespec="milliseconds")
+
+    return _local.last_str
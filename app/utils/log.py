@@ -0,0 +1,35 @@
+"""
+Non-blocking logging setup for the application.
+"""
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route the "app" logger through a queue drained by a background thread.
+
+    Request handlers only enqueue log records; the actual write to stderr
+    happens on the listener thread, so error bursts don't serialize requests
+    on stdout/stderr I/O.
+
+    Args:
+        level: Minimum level for the "app" logger
+
+    Returns:
+        Started QueueListener (call stop() on shutdown to flush it)
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+
+    logger = logging.getLogger("app")
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -15,5 +15,5 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        log_level="info",
+        log_level=settings.LOG_LEVEL.lower(),
     )
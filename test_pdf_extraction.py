@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 """
 Test script to check PDF extraction for assignment PDFs.
-Usage: python test_pdf_extraction.py <path_to_pdf>
+Usage: python test_pdf_extraction.py <path_to_pdf_or_dir> [...]
 """
 
+import contextlib
+import io
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from app.services.advanced_pdf_extractor import AdvancedPDFExtractor
 
@@ -38,9 +43,17 @@ def test_pdf_extraction(pdf_path: str):
     print(f"❓ Questions Found: {len(structured_content['questions'])}")
     print(f"📋 Scenarios Found: {len(structured_content['scenarios'])}")
 
-    # Count tables and images
-    total_tables = sum(len(page['tables']) for page in structured_content['pages'])
-    total_images = sum(len(page['images']) for page in structured_content['pages'])
+    # Count tables and images in one pass, remembering which pages have them
+    total_tables = total_images = 0
+    table_refs = []  # (page_num, tables)
+    image_refs = []  # (page_num, images)
+    for page_num, page in enumerate(structured_content['pages'], 1):
+        if page['tables']:
+            total_tables += len(page['tables'])
+            table_refs.append((page_num, page['tables']))
+        if page['images']:
+            total_images += len(page['images'])
+            image_refs.append((page_num, page['images']))
 
     print(f"📊 Tables Found: {total_tables}")
     print(f"🖼️  Images Found: {total_images}")
@@ -59,23 +72,21 @@ def test_pdf_extraction(pdf_path: str):
         print("\n" + "=" * 80)
         print("TABLES DETECTED")
         print("=" * 80)
-        for page_num, page in enumerate(structured_content['pages'], 1):
-            if page['tables']:
-                for table_num, table in enumerate(page['tables'], 1):
-                    print(f"\n[Table {table_num}] on Page {page_num}")
-                    if table['data']:
-                        print("Table preview (first 3 rows):")
-                        for row in table['data'][:3]:
-                            print("  | " + " | ".join(str(cell) for cell in row))
+        for page_num, tables in table_refs:
+            for table_num, table in enumerate(tables, 1):
+                print(f"\n[Table {table_num}] on Page {page_num}")
+                if table['data']:
+                    print("Table preview (first 3 rows):")
+                    for row in table['data'][:3]:
+                        print("  | " + " | ".join(str(cell) for cell in row))
 
     # Display images
     if total_images > 0:
         print("\n" + "=" * 80)
         print("IMAGES DETECTED")
         print("=" * 80)
-        for page_num, page in enumerate(structured_content['pages'], 1):
-            if page['images']:
-                print(f"\nPage {page_num}: {len(page['images'])} image(s) found")
+        for page_num, images in image_refs:
+            print(f"\nPage {page_num}: {len(images)} image(s) found")
 
     # Display questions
     print("\n" + "=" * 80)
@@ -129,17 +140,46 @@ def test_pdf_extraction(pdf_path: str):
     print("=" * 80)
 
 
+def _extraction_report(pdf_path: str) -> str:
+    """Run test_pdf_extraction and return its output as one string."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        test_pdf_extraction(pdf_path)
+    return buffer.getvalue()
+
+
+def _collect_pdfs(paths):
+    """Expand the command line paths into PDF files; directories add their *.pdf."""
+    pdfs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            pdfs.extend(sorted(path.glob("*.pdf")))
+        elif path.exists():
+            pdfs.append(path)
+        else:
+            print(f"Error: File not found: {path}")
+            sys.exit(1)
+    return pdfs
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python test_pdf_extraction.py <path_to_pdf>")
+        print("Usage: python test_pdf_extraction.py <path_to_pdf_or_dir> [...]")
         print("\nExample:")
         print("  python test_pdf_extraction.py data/pdfs/assignments/my_assignment.pdf")
+        print("  python test_pdf_extraction.py data/pdfs/assignments")
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
-
-    if not Path(pdf_path).exists():
-        print(f"Error: File not found: {pdf_path}")
-        sys.exit(1)
-
-    test_pdf_extraction(pdf_path)
+    pdf_paths = _collect_pdfs(sys.argv[1:])
+
+    if len(pdf_paths) == 1:
+        test_pdf_extraction(str(pdf_paths[0]))
+    elif pdf_paths:
+        # Extract in parallel; each report is captured in its worker and
+        # printed whole, in input order, so outputs don't interleave
+        workers = min(len(pdf_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for report in executor.map(_extraction_report, map(str, pdf_paths)):
+                print(report, end="")
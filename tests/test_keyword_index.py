@@ -0,0 +1,69 @@
+"""
+Tests for the FTS5 keyword index.
+"""
+import unittest
+
+from app.services.keyword_index import KeywordIndex
+
+
+class KeywordIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = KeywordIndex()
+        self.index.add_documents(
+            [
+                "Question 5: record the depreciation of equipment.",
+                "Inventory is valued at the lower of cost and NRV.",
+                "Accrual accounting records revenue when earned.",
+            ],
+            [{"source": "a.pdf"}, {"source": "a.pdf"}, {"source": "b.pdf"}],
+            ["a_q5", "a_inv", "b_acc"],
+        )
+
+    def ids(self, query, n_results=20):
+        return [result["id"] for result in self.index.search(query, n_results)]
+
+    def test_search_ranks_matching_chunks(self):
+        self.assertEqual(self.ids("depreciation")[0], "a_q5")
+        self.assertEqual(self.ids("inventory cost"), ["a_inv"])
+
+    def test_punctuation_and_quotes_are_not_fts_syntax(self):
+        self.assertEqual(self.ids('"depreciation" (question 5)?'), ["a_q5"])
+        self.assertEqual(self.ids('NEAR(cost* AND -"NRV'), ["a_inv"])
+        self.assertEqual(self.ids("revenue OR"), ["b_acc"])
+        self.assertEqual(self.ids("?!\"'()*"), [])
+
+    def test_search_returns_metadata(self):
+        result = self.index.search("accrual")[0]
+        self.assertEqual(result["metadata"], {"source": "b.pdf"})
+        self.assertIn("Accrual", result["text"])
+
+    def test_delete_by_source_then_readd(self):
+        self.index.delete_by_source("a.pdf")
+        self.assertEqual(self.ids("depreciation inventory"), [])
+        self.assertEqual(self.ids("accrual"), ["b_acc"])
+
+        self.index.add_documents(
+            ["Question 5: record the impairment of goodwill."],
+            [{"source": "a.pdf"}],
+            ["a_q5"],
+        )
+        self.assertEqual(self.ids("impairment"), ["a_q5"])
+        self.assertEqual(self.ids("depreciation"), [])
+
+    def test_readding_an_id_replaces_its_text(self):
+        self.index.add_documents(
+            ["Question 5: prepare a trial balance."], [{"source": "a.pdf"}], ["a_q5"]
+        )
+
+        self.assertEqual(self.ids("depreciation"), [])
+        self.assertEqual(self.ids("trial balance"), ["a_q5"])
+        self.index.delete_by_source("a.pdf")
+        self.assertEqual(self.ids("trial inventory"), [])
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual(self.ids("question accrual inventory"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Tests for knowledge base retrieval and PDF loading.
+"""
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fitz
+import numpy as np
+
+from app.services.embeddings import QuantizedMiniLM
+from app.services.knowledge_base import KnowledgeBase
+
+
+def chunk(chunk_id):
+    return {"id": chunk_id, "text": chunk_id, "metadata": {"source": "a.pdf"}}
+
+
+class FuseResultsTest(unittest.TestCase):
+    def ids(self, ranked_lists, n_results=10):
+        return [result["id"] for result in KnowledgeBase._fuse_results(ranked_lists, n_results)]
+
+    def test_chunks_found_by_both_searches_rank_first(self):
+        dense = [chunk("d1"), chunk("both"), chunk("d3")]
+        keyword = [chunk("k1"), chunk("both")]
+
+        # "both" scores 2/(60+2); d1 and k1 tie at 1/(60+1) and keep list order
+        self.assertEqual(self.ids([dense, keyword]), ["both", "d1", "k1", "d3"])
+
+    def test_duplicates_are_merged_keeping_the_first_copy(self):
+        dense = [{"id": "x", "text": "dense copy", "metadata": {}}]
+        keyword = [{"id": "x", "text": "keyword copy", "metadata": {}}]
+
+        fused = KnowledgeBase._fuse_results([dense, keyword], 5)
+        self.assertEqual(len(fused), 1)
+        self.assertEqual(fused[0]["text"], "dense copy")
+
+    def test_result_count_and_empty_lists(self):
+        dense = [chunk(f"d{i}") for i in range(5)]
+
+        self.assertEqual(self.ids([dense, []], n_results=2), ["d0", "d1"])
+        self.assertEqual(self.ids([[], []]), [])
+
+    def test_rank_outweighs_list_order(self):
+        dense = [chunk("d1"), chunk("d2"), chunk("d3")]
+        keyword = [chunk("d3")]
+
+        # d3 gets 1/63 + 1/61, beating d1's single 1/61
+        self.assertEqual(self.ids([dense, keyword]), ["d3", "d1", "d2"])
+
+
+
+def fake_embed(texts):
+    """Deterministic bag-of-words embeddings, so tests don't need the ONNX model."""
+    vectors = np.zeros((len(texts), 32), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1
+    return [vector / (np.linalg.norm(vector) or 1.0) for vector in vectors]
+
+
+def write_pdf(path: Path, paragraphs: int, topic: str = "depreciation") -> None:
+    """Write a PDF of numbered paragraphs about a topic."""
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 50
+    for i in range(paragraphs):
+        if y > 780:
+            page, y = doc.new_page(), 50
+        page.insert_text((50, y), f"Paragraph {i} explains {topic} of business assets in detail.")
+        y += 14
+    doc.save(str(path))
+    doc.close()
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Base for tests that load a temp data dir repeatedly, as app restarts would."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = Path(self.tmp.name)
+        self.materials_dir = self.data_dir / "pdfs" / "materials"
+        self.materials_dir.mkdir(parents=True)
+        self.pdf = self.materials_dir / "notes.pdf"
+        write_pdf(self.pdf, paragraphs=60)
+
+        embedded = self.embedded = []
+
+        # Chroma checks the parameter names of an embedding function's __call__
+        def embed(self, input):
+            embedded.extend(input)
+            return fake_embed(input)
+
+        patcher = mock.patch.object(QuantizedMiniLM, "__call__", embed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def load(self):
+        """Load the data dir with a fresh knowledge base; returns (kb, extractions)."""
+        kb = KnowledgeBase(str(self.data_dir), query_cache_size=0)
+        self.addCleanup(kb.vector_store.close)
+        self.embedded.clear()
+        with mock.patch.object(
+            kb.processor, "extract_text", wraps=kb.processor.extract_text
+        ) as extract_text:
+            kb.load_pdfs()
+        self.assertEqual(kb.load_errors, [])
+        return kb, extract_text.call_count
+
+
+class ExtractCacheTest(DataDirTestCase):
+
+    def test_unchanged_pdf_is_neither_extracted_nor_embedded_again(self):
+        first, extractions = self.load()
+        self.assertEqual(extractions, 1)
+        self.assertGreater(len(self.embedded), 1)
+        self.assertTrue((self.data_dir / "extract_cache" / "materials" / "notes.pdf.json").exists())
+
+        second, extractions = self.load()
+        self.assertEqual(extractions, 0)
+        self.assertEqual(self.embedded, [])
+        self.assertEqual(second.materials, first.materials)
+        self.assertTrue(second.keyword_index.search("depreciation"))
+
+    def test_changed_bytes_invalidate_the_cached_extraction(self):
+        self.load()
+        write_pdf(self.pdf, paragraphs=30, topic="amortization")
+
+        kb, extractions = self.load()
+        self.assertEqual(extractions, 1)
+        self.assertIn("amortization", kb.materials["notes.pdf"])
+        self.assertTrue(self.embedded)
+
+    def test_new_cache_version_invalidates_the_cached_extraction(self):
+        self.load()
+
+        with mock.patch.object(KnowledgeBase, "EXTRACT_CACHE_VERSION", KnowledgeBase.EXTRACT_CACHE_VERSION + 1):
+            _, extractions = self.load()
+        self.assertEqual(extractions, 1)
+        # Same bytes, so the stored chunks are still current
+        self.assertEqual(self.embedded, [])
+
+
+
+class AddChunksTest(DataDirTestCase):
+    """Checks which chunks the doc_hash check re-embeds, across loads."""
+
+    def stored(self, kb):
+        """Return the stored chunks of notes.pdf as {id: (text, doc_hash)}."""
+        results = kb.vector_store.collection.get(
+            where={"source": "notes.pdf"}, include=["documents", "metadatas"]
+        )
+        return {
+            chunk_id: (text, metadata["doc_hash"])
+            for chunk_id, text, metadata in zip(
+                results["ids"], results["documents"], results["metadatas"]
+            )
+        }
+
+    def test_stored_document_is_not_embedded_again(self):
+        kb, _ = self.load()
+        doc_hash = kb._file_hash(self.pdf)
+        self.assertTrue(kb.vector_store.has_document("notes.pdf", doc_hash))
+
+        self.embedded.clear()
+        kb._add_chunks(self.pdf, ["new text"], [{"source": "notes.pdf"}], ["notes_extra"], doc_hash)
+        self.assertEqual(self.embedded, [])
+        # The keyword index is rebuilt from the given chunks either way
+        self.assertEqual([r["id"] for r in kb.keyword_index.search("new text")], ["notes_extra"])
+
+    def test_changed_document_replaces_its_old_chunks(self):
+        first, _ = self.load()
+        old_chunks = self.stored(first)
+        self.assertGreater(len(old_chunks), 1)
+
+        write_pdf(self.pdf, paragraphs=10, topic="amortization")
+        kb, _ = self.load()
+        new_hash = kb._file_hash(self.pdf)
+
+        chunks = self.stored(kb)
+        self.assertEqual(list(chunks), ["notes_chunk_0"])
+        text, doc_hash = chunks["notes_chunk_0"]
+        # A reused ID would keep its old text if the old chunks weren't deleted first
+        self.assertIn("amortization", text)
+        self.assertEqual(doc_hash, new_hash)
+        self.assertEqual(self.embedded, [text])
+        self.assertEqual(kb.keyword_index.search("depreciation"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for API endpoints, run against stub services without the startup load.
+"""
+import json
+import os
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# Settings require an API key at import; no request here reaches Gemini
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+from app import main  # noqa: E402
+from app.services.chat_manager import ChatManager  # noqa: E402
+
+
+class StubKnowledgeBase:
+    def __init__(self, body: bytes = b"{}", etag: str = ""):
+        self.assignment_index = (body, etag)
+        self.ready = True
+
+
+class StubRetrievalCache:
+    def get(self, query, n_results):
+        return "context"
+
+
+class StubLLMService:
+    """Streams fixed pieces of text, calling on_piece before each one."""
+
+    def __init__(self, pieces, on_piece=None):
+        self.pieces = pieces
+        self.on_piece = on_piece or (lambda piece: None)
+
+    async def generate_hint_stream(self, question, relevant_context, conversation_history=None):
+        for piece in self.pieces:
+            self.on_piece(piece)
+            if isinstance(piece, Exception):
+                raise piece
+            yield piece
+
+
+class EtagMatchesTest(unittest.TestCase):
+    def test_weak_comparison_and_lists(self):
+        etag = 'W/"abc"'
+
+        self.assertTrue(main.etag_matches('W/"abc"', etag))
+        self.assertTrue(main.etag_matches('"abc"', etag))
+        self.assertTrue(main.etag_matches('"xyz", W/"abc"', etag))
+        self.assertTrue(main.etag_matches(" * ", etag))
+        self.assertFalse(main.etag_matches('"xyz", "abcd"', etag))
+        self.assertFalse(main.etag_matches("", etag))
+
+
+class AssignmentQuestionsTest(unittest.TestCase):
+    def setUp(self):
+        body = b'{"assignments":[' + b'{"filename":"a.pdf","questions":[]},' * 60 + b'{}]}'
+        self.etag = 'W/"abc"'
+        patcher = mock.patch.object(main, "knowledge_base", StubKnowledgeBase(body, self.etag))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(main.app)
+
+    def get(self, **headers):
+        return self.client.get("/api/assignment-questions", headers=headers)
+
+    def test_revalidation_returns_304(self):
+        for if_none_match in ('W/"abc"', '"abc"', '"old", W/"abc"', "*"):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.get(**{"If-None-Match": if_none_match})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["etag"], self.etag)
+
+    def test_changed_etag_returns_body(self):
+        response = self.get(**{"If-None-Match": '"old"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["assignments"]), 61)
+
+    def test_same_weak_etag_for_every_encoding(self):
+        for encoding in ("gzip", "identity"):
+            with self.subTest(encoding=encoding):
+                response = self.get(**{"Accept-Encoding": encoding})
+                self.assertEqual(response.headers["etag"], self.etag)
+                self.assertIn("Accept-Encoding", response.headers["vary"])
+
+
+
+class ChatStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.chat_manager = ChatManager(max_history_length=20, session_timeout_minutes=30)
+        self.session_id = self.chat_manager.create_session()
+        for name, value in (
+            ("knowledge_base", StubKnowledgeBase()),
+            ("chat_manager", self.chat_manager),
+            ("retrieval_cache", StubRetrievalCache()),
+        ):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(main.app)
+
+    def stream(self, llm_service):
+        with mock.patch.object(main, "llm_service", llm_service):
+            response = self.client.post(
+                "/api/chat/stream",
+                json={"session_id": self.session_id, "message": "hint for question 3"},
+            )
+        self.assertEqual(response.status_code, 200)
+        return [
+            json.loads(line[len("data: "):])
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+
+    def test_complete_stream_is_saved(self):
+        events = self.stream(StubLLMService(["Think ", "about it."]))
+
+        self.assertEqual([event.get("delta") for event in events[:2]], ["Think ", "about it."])
+        self.assertTrue(events[-1]["done"])
+        history = self.chat_manager.get_history(self.session_id)
+        self.assertEqual(
+            [(m["role"], m["content"]) for m in history],
+            [("user", "hint for question 3"), ("assistant", "Think about it.")],
+        )
+
+    def test_mid_stream_failure_sends_error_and_saves_nothing(self):
+        events = self.stream(StubLLMService(["Think ", RuntimeError("stream broke")]))
+
+        self.assertEqual(events[0]["delta"], "Think ")
+        self.assertIn("error", events[-1])
+        self.assertNotIn("done", events[-1])
+        self.assertEqual(self.chat_manager.get_history(self.session_id), [])
+
+    def test_session_evicted_while_streaming_sends_error(self):
+        def evict(piece):
+            self.chat_manager.delete_session(self.session_id)
+
+        events = self.stream(StubLLMService(["Think ", "about it."], on_piece=evict))
+
+        self.assertEqual(len(events), 3)
+        self.assertIn("error", events[-1])
+        self.assertEqual(events[-1]["session_id"], self.session_id)
+        self.assertFalse(self.chat_manager.session_exists(self.session_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the Gemini token-bucket rate limiter.
+"""
+import unittest
+from unittest import mock
+
+from app.services.ratelimit import TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        for name, fake in (("monotonic", lambda: self.now), ("sleep", sleep)):
+            patcher = mock.patch(f"app.services.ratelimit.time.{name}", side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rejects_invalid_settings(self):
+        for rate, burst in ((0, 5), (-10, 5), (20, 0), (20, -1)):
+            with self.subTest(rate=rate, burst=burst), self.assertRaises(ValueError):
+                TokenBucket(rate, burst)
+
+    def test_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(rate_per_min=60, burst=3)
+
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.sleeps, [])
+
+        # One token per second at 60/min
+        bucket.acquire()
+        self.assertEqual(self.sleeps, [1.0])
+        self.assertAlmostEqual(self.now, 101.0)
+
+    def test_partial_refill_shortens_the_wait(self):
+        bucket = TokenBucket(rate_per_min=30, burst=1)
+        bucket.acquire()
+
+        self.now += 1.5
+        bucket.acquire()
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertAlmostEqual(self.sleeps[0], 0.5)
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate_per_min=60, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        self.now += 60
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.sleeps, [])
+        bucket.acquire()
+        self.assertEqual(self.sleeps, [1.0])
+
+
+class TokenBucketAsyncTest(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_async_waits_for_refill(self):
+        now = [0.0]
+        sleeps = []
+
+        async def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        with mock.patch("app.services.ratelimit.time.monotonic", side_effect=lambda: now[0]), \
+                mock.patch("app.services.ratelimit.asyncio.sleep", side_effect=sleep):
+            bucket = TokenBucket(rate_per_min=120, burst=1)
+            await bucket.acquire_async()
+            await bucket.acquire_async()
+
+        self.assertEqual(sleeps, [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
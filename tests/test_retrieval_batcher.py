@@ -0,0 +1,84 @@
+"""
+Tests for micro-batching of retrieval requests.
+"""
+import asyncio
+import threading
+import unittest
+
+from app.services.retrieval_batcher import RetrievalBatcher
+
+
+class StubKnowledgeBase:
+    """Records each batch and answers with one context per query."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail_next = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def batch_get_relevant_context(self, queries, n_results=5):
+        self.release.wait(5)
+        self.batches.append(list(queries))
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("search failed")
+        return [f"context for {query} ({n_results})" for query in queries]
+
+
+class RetrievalBatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.kb = StubKnowledgeBase()
+        self.batcher = RetrievalBatcher(self.kb, n_results=3, max_batch_size=4, max_wait_ms=50)
+        self.batcher.start()
+
+    async def asyncTearDown(self):
+        self.kb.release.set()
+        await self.batcher.stop()
+
+    async def test_concurrent_queries_are_batched_and_fanned_out(self):
+        queries = ["q1", "question 2", "q1", "hint for 4", "q5"]
+
+        contexts = await asyncio.gather(
+            *(self.batcher.get_relevant_context(query) for query in queries)
+        )
+
+        self.assertEqual(contexts, [f"context for {query} (3)" for query in queries])
+        # max_batch_size caps the first batch; the rest go in the next one
+        self.assertEqual(self.kb.batches, [queries[:4], queries[4:]])
+
+    async def test_failed_batch_fails_every_waiter_and_worker_continues(self):
+        self.kb.fail_next = True
+
+        results = await asyncio.gather(
+            self.batcher.get_relevant_context("a"),
+            self.batcher.get_relevant_context("b"),
+            return_exceptions=True,
+        )
+
+        self.assertEqual(len(self.kb.batches), 1)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+        self.assertEqual(await self.batcher.get_relevant_context("c"), "context for c (3)")
+
+    async def test_cancelled_waiter_does_not_break_the_batch(self):
+        self.kb.release.clear()
+        cancelled = asyncio.create_task(self.batcher.get_relevant_context("gone"))
+        waiting = asyncio.create_task(self.batcher.get_relevant_context("kept"))
+
+        # Let both queries join one batch, then cancel one caller mid-search
+        await asyncio.sleep(0.1)
+        cancelled.cancel()
+        self.kb.release.set()
+
+        self.assertEqual(await waiting, "context for kept (3)")
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        self.assertEqual(self.kb.batches, [["gone", "kept"]])
+        # The worker survived resolving the cancelled future
+        next_context = await asyncio.wait_for(self.batcher.get_relevant_context("next"), 2)
+        self.assertEqual(next_context, "context for next (3)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for the exact-query retrieval cache.
+"""
+import unittest
+from unittest import mock
+
+from app.services.retrieval_cache import RetrievalCache
+
+
+class RetrievalCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch(
+            "app.services.retrieval_cache.time.monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = RetrievalCache(max_size=2, ttl_seconds=60)
+
+    def test_normalized_queries_share_an_entry(self):
+        self.cache.set("  Foo ", 5, "context")
+
+        self.assertEqual(self.cache.get("foo", 5), "context")
+        self.assertEqual(self.cache.get("FOO\t", 5), "context")
+        self.assertIsNone(self.cache.get("foo", 3))
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("foo", 5, "context")
+
+        self.now += 60
+        self.assertEqual(self.cache.get("foo", 5), "context")
+        self.now += 1
+        self.assertIsNone(self.cache.get("foo", 5))
+        self.assertEqual(self.cache.get_stats()["size"], 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 5, "A")
+        self.cache.set("b", 5, "B")
+        self.cache.get("a", 5)
+        self.cache.set("c", 5, "C")
+
+        self.assertIsNone(self.cache.get("b", 5))
+        self.assertEqual(self.cache.get("a", 5), "A")
+        self.assertEqual(self.cache.get("c", 5), "C")
+
+    def test_set_refreshes_an_existing_entry(self):
+        self.cache.set("a", 5, "old")
+        self.now += 50
+        self.cache.set("b", 5, "B")
+        self.cache.set("a", 5, "new")
+        self.cache.set("c", 5, "C")
+
+        self.now += 30
+        self.assertEqual(self.cache.get("a", 5), "new")
+        self.assertIsNone(self.cache.get("b", 5))
+
+    def test_clear(self):
+        self.cache.set("a", 5, "A")
+
+        self.assertEqual(self.cache.clear(), 1)
+        self.assertIsNone(self.cache.get("a", 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the semantic query cache.
+"""
+import unittest
+
+import numpy as np
+
+from app.services.semantic_cache import SemanticCache
+
+
+class SemanticCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(max_size=8, threshold=0.97)
+        self.embedding = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        self.results = [{"id": "chunk_0", "text": "...", "metadata": {}, "distance": 0.1}]
+
+    def test_similar_query_hits(self):
+        self.cache.set(self.embedding, 5, self.results, query="hint for question 3")
+        near = np.array([1.0, 0.05, 0.0], dtype=np.float32)
+
+        self.assertEqual(self.cache.get(near, 5, query="give me a hint for question 3"), self.results)
+
+    def test_different_question_number_misses(self):
+        self.cache.set(self.embedding, 5, self.results, query="hint for question 3")
+
+        self.assertIsNone(self.cache.get(self.embedding, 5, query="hint for question 4"))
+        self.assertEqual(self.cache.get(self.embedding, 5, query="hint for question 3"), self.results)
+
+    def test_different_sub_part_misses(self):
+        self.cache.set(self.embedding, 5, self.results, query="how do I start 2a")
+
+        self.assertIsNone(self.cache.get(self.embedding, 5, query="how do I start 2b"))
+
+    def test_different_letter_part_misses(self):
+        self.cache.set(self.embedding, 5, self.results, query="hint for part a")
+
+        self.assertIsNone(self.cache.get(self.embedding, 5, query="hint for part b"))
+        self.assertIsNone(self.cache.get(self.embedding, 5, query="hint for Question A"))
+        self.assertEqual(self.cache.get(self.embedding, 5, query="Hint for Part (a)"), self.results)
+
+    def test_different_roman_section_misses(self):
+        self.cache.set(self.embedding, 5, self.results, query="explain section ii")
+
+        self.assertIsNone(self.cache.get(self.embedding, 5, query="explain section iii"))
+
+    def test_plain_words_are_not_identifiers(self):
+        self.cache.set(self.embedding, 5, self.results, query="questions about depreciation")
+
+        self.assertEqual(
+            self.cache.get(self.embedding, 5, query="a question about depreciation"), self.results
+        )
+
+    def test_filter_and_result_count_must_match(self):
+        self.cache.set(self.embedding, 5, self.results, filter_key='{"type": "assignment"}')
+
+        self.assertIsNone(self.cache.get(self.embedding, 5))
+        self.assertIsNone(self.cache.get(self.embedding, 10, '{"type": "assignment"}'))
+        self.assertEqual(self.cache.get(self.embedding, 3, '{"type": "assignment"}'), self.results)
+
+    def test_clear_drops_stale_results(self):
+        generation = self.cache.generation
+        self.cache.clear()
+        self.cache.set(self.embedding, 5, self.results, generation=generation)
+
+        self.assertIsNone(self.cache.get(self.embedding, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()